@@ -0,0 +1,212 @@
+"""
+anomaly_detector.py
+-------------------
+Streaming failure-rate anomaly detection per suite / DUT / test case.
+
+Replaces the notebook check (groupby/unstack over the whole history, one
+global mean + 2σ threshold) with per-key running statistics that are
+updated incrementally, one run's rows at a time:
+- every key (e.g. ("suite", "sip")) keeps FAIL / total counts for its open
+  time windows (default: one day)
+- when a window closes, its failure rate is compared with the key's EWMA
+  mean + THRESHOLD_SIGMAS * EWMA std, then folded into the statistics
+- each update is O(1); history is never recomputed
+
+update_frame() feeds rows in time order, so files walked in arbitrary
+order within one run are not dropped. A window closes once a row
+ALLOWED_LATENESS windows newer arrives for the same key, or when
+close_expired() finds it behind the newest window seen for any key
+(the watermark) by more than ALLOWED_LATENESS. The newest windows stay
+open across nightly runs (save_state()/load_state()), so a file for the
+latest day that only arrives the next night is still counted. Rows for
+an already-closed window are counted in `late_rows`, not scored.
+Because open windows persist, the content hashes of files already fed are
+saved too (`seen_files`); update_frame(frame, file_hashes) skips their
+rows, so re-walking the same tree every night does not count them again.
+flush() closes everything, for one-off batch analysis only.
+"""
+
+import json
+import math
+import os
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["suite", "dut", "test_case_id"]
+WINDOW = "1D"
+ALPHA = 0.1               # EWMA smoothing factor
+THRESHOLD_SIGMAS = 2.0    # same rule as the notebook: mean + 2σ
+MIN_WINDOWS = 5           # closed windows needed before a key can flag anomalies
+MIN_WINDOW_RUNS = 1       # runs needed in a window for it to be scored
+ALLOWED_LATENESS = 1      # windows kept open for out-of-order files
+MIN_STD = 0.02            # floor so a key that never failed doesn't flag its first failure
+
+
+class FailureRateDetector:
+    """Per-key EWMA of windowed failure rates with O(1) updates."""
+
+    def __init__(self, key_columns=KEY_COLUMNS, window=WINDOW, alpha=ALPHA,
+                 threshold_sigmas=THRESHOLD_SIGMAS, min_windows=MIN_WINDOWS,
+                 min_window_runs=MIN_WINDOW_RUNS, allowed_lateness=ALLOWED_LATENESS,
+                 min_std=MIN_STD, on_anomaly=None):
+        self.key_columns = list(key_columns)
+        self.window_ns = pd.Timedelta(window).value
+        self.alpha = alpha
+        self.threshold_sigmas = threshold_sigmas
+        self.min_windows = min_windows
+        self.min_window_runs = min_window_runs
+        self.allowed_lateness = allowed_lateness
+        self.min_std = min_std
+        self.on_anomaly = on_anomaly
+        # key -> {"open": {window: [fails, total]}, "closed_upto": int, "n": int, "mean": float, "var": float}
+        self.state = {}
+        self.anomalies = []
+        self.late_rows = 0
+        self.watermark = None      # newest window id seen for any key
+        self.seen_files = set()    # content hashes of log files already fed
+
+    # ==============================
+    # Updates
+    def update(self, key, window, is_fail):
+        """Count one run for `key` in `window` (integer window id)."""
+        st = self.state.get(key)
+        if st is None:
+            st = self.state[key] = {"open": {}, "closed_upto": None, "n": 0, "mean": 0.0, "var": 0.0}
+        if st["closed_upto"] is not None and window <= st["closed_upto"]:
+            self.late_rows += 1
+            return
+        if self.watermark is None or window > self.watermark:
+            self.watermark = window
+
+        counts = st["open"].get(window)
+        if counts is None:
+            counts = st["open"][window] = [0, 0]
+        counts[0] += is_fail
+        counts[1] += 1
+
+        # Close windows that fell behind the lateness horizon (at most allowed_lateness + 1 open)
+        horizon = window - self.allowed_lateness
+        for w in sorted(w for w in st["open"] if w < horizon):
+            self._close(key, st, w)
+
+    def update_frame(self, frame, file_hashes=None):
+        """Feed a frame (unified schema) into the detector, oldest rows first.
+
+        Pass a whole run at once: rows are sorted by time here, so the order
+        files were walked in does not close windows early. With
+        `file_hashes` (content hash per file_id), rows of files fed in an
+        earlier run are skipped and the new hashes are recorded.
+        """
+        if file_hashes is not None:
+            fresh = [i for i, h in enumerate(file_hashes) if h not in self.seen_files]
+            frame = frame[frame["file_id"].isin(fresh)]
+            self.seen_files.update(file_hashes)
+        times = frame["timestamp"].fillna(frame["run_date"])
+        valid = times.notna() & frame["status"].notna()
+        if not valid.any():
+            return
+        order = np.argsort(times[valid].to_numpy("datetime64[ns]").astype(np.int64), kind="stable")
+        sub = frame[valid].iloc[order]
+        windows = times[valid].iloc[order].to_numpy("datetime64[ns]").astype(np.int64) // self.window_ns
+        is_fail = (sub["status"] == "FAIL").to_numpy()
+        for col in self.key_columns:
+            values = sub[col].to_numpy()
+            for value, window, fail in zip(values, windows, is_fail):
+                if value is None or value != value:
+                    continue
+                self.update((col, value), int(window), bool(fail))
+
+    def close_expired(self):
+        """Close windows more than allowed_lateness behind the watermark (end of a run).
+
+        Newer windows stay open, and are saved with save_state(), for rows that
+        arrive in a later run.
+        """
+        if self.watermark is None:
+            return self.anomalies
+        horizon = self.watermark - self.allowed_lateness
+        for key, st in self.state.items():
+            for w in sorted(w for w in st["open"] if w < horizon):
+                self._close(key, st, w)
+        return self.anomalies
+
+    def flush(self):
+        """Close every open window (batch analysis; later rows for them become late)."""
+        for key, st in self.state.items():
+            for w in sorted(st["open"]):
+                self._close(key, st, w)
+        return self.anomalies
+
+    # ==============================
+    # Window Scoring
+    def _close(self, key, st, window):
+        fails, total = st["open"].pop(window)
+        st["closed_upto"] = window if st["closed_upto"] is None else max(st["closed_upto"], window)
+        if total < self.min_window_runs:
+            return
+        rate = fails / total
+
+        std = max(math.sqrt(st["var"]), self.min_std)
+        threshold = st["mean"] + self.threshold_sigmas * std
+        if st["n"] >= self.min_windows and rate > threshold:
+            anomaly = {
+                "key_column": key[0],
+                "key": key[1],
+                "window_start": pd.Timestamp(window * self.window_ns),
+                "fail_count": fails,
+                "total": total,
+                "failure_rate": rate,
+                "ewma_mean": st["mean"],
+                "ewma_std": std,
+                "threshold": threshold,
+            }
+            self.anomalies.append(anomaly)
+            if self.on_anomaly:
+                self.on_anomaly(anomaly)
+
+        # EWMA mean / variance update (first window seeds the mean)
+        if st["n"] == 0:
+            st["mean"] = rate
+        else:
+            diff = rate - st["mean"]
+            incr = self.alpha * diff
+            st["mean"] += incr
+            st["var"] = (1 - self.alpha) * (st["var"] + diff * incr)
+        st["n"] += 1
+
+    # ==============================
+    # Persistence
+    def save_state(self, path):
+        """Persist running statistics (and still-open windows) for the next run."""
+        payload = [
+            {"key": list(key), "open": [[w, c[0], c[1]] for w, c in st["open"].items()],
+             "closed_upto": st["closed_upto"], "n": st["n"], "mean": st["mean"], "var": st["var"]}
+            for key, st in self.state.items()
+        ]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"window_ns": self.window_ns, "watermark": self.watermark,
+                       "seen_files": sorted(self.seen_files), "keys": payload}, f, default=str)
+
+    def load_state(self, path):
+        if not os.path.exists(path):
+            return self
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload["window_ns"] != self.window_ns:
+            raise ValueError(f"State in {path} uses a different window size; delete it to reset.")
+        self.watermark = payload.get("watermark")
+        self.seen_files = set(payload.get("seen_files", []))
+        for item in payload["keys"]:
+            self.state[tuple(item["key"])] = {
+                "open": {w: [fails, total] for w, fails, total in item["open"]},
+                "closed_upto": item["closed_upto"],
+                "n": item["n"], "mean": item["mean"], "var": item["var"],
+            }
+        return self
+
+    def anomalies_frame(self):
+        return pd.DataFrame(self.anomalies, columns=[
+            "key_column", "key", "window_start", "fail_count", "total",
+            "failure_rate", "ewma_mean", "ewma_std", "threshold",
+        ])
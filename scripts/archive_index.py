@@ -0,0 +1,136 @@
+"""
+archive_index.py
+----------------
+Random-access member index for Attest_Archive_*.tar.gz log archives.
+
+While an archive is streamed once during ingestion, a sidecar index is built
+next to it:
+- <archive>.idx.json : member name, header/data offsets and size in the
+                       uncompressed tar stream
+- <archive>.gzidx    : decompressor checkpoints (indexed_gzip / zran-style):
+                       the compressed/uncompressed offset pair and the 32 KiB
+                       inflate window every CHECKPOINT_SPACING uncompressed bytes
+
+fetch_member() returns one member (or a line range within it) by seeking
+to the nearest checkpoint and inflating at most CHECKPOINT_SPACING bytes,
+instead of decompressing the archive from the start.
+
+Storage cost: about 32 KiB per CHECKPOINT_SPACING (16 MiB) of uncompressed
+tar, i.e. ~0.2% of the uncompressed size (a few % of the .tar.gz), not a
+copy of the archive. Once an archive is indexed and ingested, its
+extracted data/raw tree is no longer needed for drill-down.
+
+indexed_gzip is imported lazily, only when an index is built or read.
+"""
+
+import json
+import os
+import tarfile
+
+CHECKPOINT_SPACING = 16 * 1024 * 1024
+WINDOW_SIZE = 32 * 1024
+READ_BUFFER = 1024 * 1024
+INDEX_SUFFIX = ".idx.json"
+CHECKPOINTS_SUFFIX = ".gzidx"
+
+
+def index_paths(tar_path):
+    return tar_path + INDEX_SUFFIX, tar_path + CHECKPOINTS_SUFFIX
+
+
+# ==============================
+# Index Building
+def build_archive_index(tar_path, on_member=None, spacing=CHECKPOINT_SPACING):
+    """Stream `tar_path` once, writing its sidecar index and checkpoints.
+
+    `on_member(member, tar)` is called for every regular file while the
+    stream is positioned on it, so callers can extract/parse in the same pass.
+    """
+    from indexed_gzip import IndexedGzipFile
+
+    index_path, checkpoints_path = index_paths(tar_path)
+    members = []
+    # Checkpoints are recorded as the stream is inflated sequentially; a small read
+    # buffer matters: with the default (4 * spacing) points are not always recorded
+    with IndexedGzipFile(tar_path, spacing=spacing, window_size=WINDOW_SIZE,
+                         buffer_size=READ_BUFFER) as raw:
+        with tarfile.open(fileobj=raw, mode="r|") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                members.append({
+                    "name": member.name,
+                    "offset": member.offset,
+                    "offset_data": member.offset_data,
+                    "size": member.size,
+                })
+                if on_member:
+                    on_member(member, tar)
+        # Read the tar padding too, so the index covers the whole stream
+        while raw.read(spacing):
+            pass
+        raw.export_index(checkpoints_path + ".tmp")
+
+    stat = os.stat(tar_path)
+    index = {
+        "archive": os.path.basename(tar_path),
+        "archive_size": stat.st_size,
+        "archive_mtime": stat.st_mtime,
+        "checkpoint_spacing": spacing,
+        "members": members,
+    }
+    os.replace(checkpoints_path + ".tmp", checkpoints_path)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    print(f"Indexed {len(members)} members, "
+          f"{os.path.getsize(checkpoints_path) // 1024} KiB of checkpoints → {index_path}")
+    return index
+
+
+# ==============================
+# Random Access
+def load_archive_index(tar_path):
+    """Load the sidecar index; raises if it is missing or stale for this archive."""
+    index_path, _ = index_paths(tar_path)
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"No index for {tar_path}. Run extract_logs.py to build it.")
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index["archive_size"] != os.path.getsize(tar_path):
+        raise ValueError(f"Index {index_path} is stale (archive size changed). Rebuild it.")
+    return index
+
+
+def find_member(index, name):
+    """Look up a member by full tar path, falling back to its basename (the CSV `filename`)."""
+    for member in index["members"]:
+        if member["name"] == name:
+            return member
+    for member in index["members"]:
+        if os.path.basename(member["name"]) == name:
+            return member
+    raise KeyError(f"Member '{name}' not found in {index['archive']}")
+
+
+def read_range(tar_path, index, start, length):
+    """Return `length` bytes of the uncompressed tar stream starting at `start`."""
+    from indexed_gzip import IndexedGzipFile
+
+    _, checkpoints_path = index_paths(tar_path)
+    with IndexedGzipFile(tar_path, index_file=checkpoints_path) as raw:
+        raw.seek(start)
+        return raw.read(length)
+
+
+def fetch_member(tar_path, name, line_start=None, line_end=None, index=None):
+    """Return one member's text, or lines [line_start, line_end] (1-based, inclusive)."""
+    index = index or load_archive_index(tar_path)
+    member = find_member(index, name)
+    data = read_range(tar_path, index, member["offset_data"], member["size"])
+    text = data.decode("utf-8", errors="ignore")
+    if line_start is None and line_end is None:
+        return text
+    lines = text.splitlines()
+    first = max((line_start or 1) - 1, 0)
+    last = line_end or len(lines)
+    return "\n".join(lines[first:last])
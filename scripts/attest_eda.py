@@ -0,0 +1,168 @@
+"""
+attest_eda.py
+-------------
+Single command-line entry point for the pipeline:
+
+    python attest_eda.py ingest                 # parse logs → logs_preprocessed.csv
+    python attest_eda.py features               # → data/features/failure_features.csv
+    python attest_eda.py cluster                # → data/cluster/failure_clusters.csv
+    (each stage takes --input / --output; the defaults chain into each other)
+    python attest_eda.py report profile|correlations|associations|all
+    python attest_eda.py query status           # status counts
+    python attest_eda.py query flaky --top 20   # flakiest (test case, DUT, config)
+    python attest_eda.py query test TC DUT CONFIG
+
+Heavy dependencies (pandas, numpy, sklearn, sentence_transformers/torch,
+matplotlib, seaborn) are imported only inside the subcommand that needs
+them, so `--help` and `query` start in well under a second. Paths used by
+`query` are repeated here rather than imported from the pipeline modules,
+which import pandas at module level. bench_cli_startup.py checks this.
+"""
+
+import argparse
+import csv
+import os
+import sys
+from collections import Counter
+
+# Same defaults as preprocess_logs.py
+PREPROCESSED_CSV = "C:/Users/hemalatha/Desktop/attest-eda/data/logs_preprocessed.csv"
+HISTORY_STORE = "C:/Users/hemalatha/Desktop/attest-eda/data/test_history.json"
+# Same defaults as feature_engineering.py / failure_clustering.py
+FEATURES_CSV = "data/features/failure_features.csv"
+CLUSTERS_CSV = "data/cluster/failure_clusters.csv"
+
+
+# ==============================
+# Pipeline Stages
+def cmd_ingest(args):
+    from preprocess_logs import run_preprocessing
+    run_preprocessing(args.input_dir, args.output)
+
+
+def cmd_features(args):
+    from feature_engineering import generate_features
+    generate_features(args.input, args.output)
+
+
+def cmd_cluster(args):
+    from failure_clustering import cluster_failures_bert
+    cluster_failures_bert(auto_k=args.auto_k, input_file=args.input, output_file=args.output)
+
+
+def cmd_report(args):
+    if args.kind in ("profile", "all"):
+        from data_profiler import INPUT_FILE, profile_csv, write_reports
+        report = profile_csv(args.input or INPUT_FILE)
+        json_path, html_path = write_reports(report)
+        print(f"Profile saved → {json_path}, {html_path}")
+    if args.kind == "associations":
+        # Plot-free; "correlations" already includes it
+        from cluster_association import ATTRIBUTES, CLUSTER_COLUMN, INPUT_FILE, write_associations
+        from schema import load_csv
+        write_associations(load_csv(args.input or INPUT_FILE, columns=[CLUSTER_COLUMN, *ATTRIBUTES]))
+    if args.kind in ("correlations", "all"):
+        from correlation_analysis import analyze_failure_correlations
+        analyze_failure_correlations()
+
+
+# ==============================
+# Queries (standard library only)
+def cmd_query_status(args):
+    counts = Counter()
+    with open(args.input, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        col = next(reader).index("status")
+        for row in reader:
+            counts[row[col] or "<missing>"] += 1
+    total = sum(counts.values())
+    for status, n in counts.most_common():
+        print(f"{status:<12}{n:>12}{100 * n / total:>9.2f}%")
+    print(f"{'TOTAL':<12}{total:>12}")
+
+
+def cmd_query_flaky(args):
+    from history_store import HistoryStore
+    rows = HistoryStore(args.history).top_flaky(args.top, min_runs=args.min_runs)
+    if not rows:
+        print("No flaky tests recorded.")
+        return
+    print(f"{'test_case_id':<30}{'dut':<16}{'config':<16}{'runs':>6}{'fails':>7}{'flips':>7}{'flakiness':>11}")
+    for r in rows:
+        print(f"{str(r['test_case_id']):<30}{str(r['dut']):<16}{str(r['config']):<16}"
+              f"{r['runs']:>6}{r['fails']:>7}{r['flips']:>7}{r['flakiness']:>11.3f}")
+
+
+def cmd_query_test(args):
+    from history_store import HistoryStore
+    store = HistoryStore(args.history)
+    summary = store.flakiness(args.test_case_id, args.dut, args.config)
+    if summary is None:
+        print("No history for this test case / DUT / config.")
+        return 1
+    for field, value in summary.items():
+        print(f"{field:<16}{value}")
+    print("\nRecent runs:")
+    for when, outcome in store.recent_outcomes(args.test_case_id, args.dut, args.config, args.last):
+        print(f"  {when}  {outcome}")
+
+
+# ==============================
+# Argument Parsing
+def build_parser():
+    parser = argparse.ArgumentParser(prog="attest_eda", description="ATTEST log EDA pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="parse raw/standardized logs into the preprocessed CSV")
+    p.add_argument("--input-dir", default="C:/Users/hemalatha/Desktop/attest-eda/data/standardized")
+    p.add_argument("--output", default=PREPROCESSED_CSV)
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("features", help="generate failure features")
+    p.add_argument("--input", default=PREPROCESSED_CSV, help="preprocessed CSV written by ingest")
+    p.add_argument("--output", default=FEATURES_CSV)
+    p.set_defaults(func=cmd_features)
+
+    p = sub.add_parser("cluster", help="cluster failure messages (BERT + KMeans)")
+    p.add_argument("--auto-k", action="store_true", help="choose the cluster count by a sampled search")
+    p.add_argument("--input", default=FEATURES_CSV, help="features CSV written by features")
+    p.add_argument("--output", default=CLUSTERS_CSV)
+    p.set_defaults(func=cmd_cluster)
+
+    p = sub.add_parser("report", help="data profile, correlation plots and/or cluster associations")
+    p.add_argument("kind", choices=["profile", "correlations", "associations", "all"])
+    p.add_argument("--input", default=None, help="CSV to read for profile / associations (module default)")
+    p.set_defaults(func=cmd_report)
+
+    q = sub.add_parser("query", help="fast lookups without loading the pipeline")
+    qsub = q.add_subparsers(dest="query", required=True)
+
+    p = qsub.add_parser("status", help="status counts in the preprocessed CSV")
+    p.add_argument("--input", default=PREPROCESSED_CSV)
+    p.set_defaults(func=cmd_query_status)
+
+    p = qsub.add_parser("flaky", help="flakiest test case / DUT / config keys")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--min-runs", type=int, default=5)
+    p.add_argument("--history", default=HISTORY_STORE)
+    p.set_defaults(func=cmd_query_flaky)
+
+    p = qsub.add_parser("test", help="history of one test case on one DUT / config")
+    p.add_argument("test_case_id")
+    p.add_argument("dut")
+    p.add_argument("config")
+    p.add_argument("--last", type=int, default=10)
+    p.add_argument("--history", default=HISTORY_STORE)
+    p.set_defaults(func=cmd_query_test)
+    return parser
+
+
+def main(argv=None):
+    # Pipeline modules import each other by bare name
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    args = build_parser().parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
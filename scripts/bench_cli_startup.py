@@ -0,0 +1,81 @@
+"""
+bench_cli_startup.py
+--------------------
+Startup-time benchmark for attest_eda.py.
+
+Runs each trivial subcommand REPEATS times in a fresh interpreter and
+reports the median wall time against BUDGET_MS, then re-runs it under
+`python -X importtime` to check that no heavy dependency was imported.
+Exits non-zero if any command is over budget or imports a heavy module,
+so it can run as a CI / pre-commit check.
+
+Usage: python bench_cli_startup.py
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CLI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "attest_eda.py")
+REPEATS = 7
+BUDGET_MS = 300
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "seaborn", "sklearn", "sentence_transformers", "torch"]
+
+
+def fixtures(tmp_dir):
+    """Tiny preprocessed CSV and history store so the queries do real work."""
+    csv_path = os.path.join(tmp_dir, "logs_preprocessed.csv")
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("filename,status\n" + "a.log,PASS\nb.log,FAIL\nc.log,\n" * 1000)
+    history_path = os.path.join(tmp_dir, "test_history.json")
+    with open(history_path, "w", encoding="utf-8") as f:
+        json.dump({"entries": [[["TC1", "dut1", "cfg"], {
+            "times": list(range(6)), "outcomes": ["PASS", "FAIL"] * 3, "runs": 6, "fails": 3,
+            "pass_to_fail": 3, "flips": 5, "last_failure": 5}]], "seen_runs": []}, f)
+    return [
+        ["--help"],
+        ["query", "status", "--input", csv_path],
+        ["query", "flaky", "--top", "10", "--history", history_path],
+        ["query", "test", "TC1", "dut1", "cfg", "--history", history_path],
+    ]
+
+
+def time_command(args):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, CLI, *args], stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def heavy_imports(args):
+    """Top-level packages from HEAVY_MODULES that appear in the -X importtime log."""
+    result = subprocess.run([sys.executable, "-X", "importtime", CLI, *args],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    imported = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip().split(".")[0]
+            if name in HEAVY_MODULES:
+                imported.add(name)
+    return sorted(imported)
+
+
+if __name__ == "__main__":
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for args in fixtures(tmp_dir):
+            label = " ".join(args[:2])
+            median_ms = time_command(args)
+            heavy = heavy_imports(args)
+            ok = median_ms <= BUDGET_MS and not heavy
+            failed |= not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {label:<16} median {median_ms:7.1f} ms"
+                  + (f"  heavy imports: {', '.join(heavy)}" if heavy else ""))
+    print(f"\nBudget: {BUDGET_MS} ms per command ({REPEATS} runs, median)")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,145 @@
+"""
+cluster_association.py
+----------------------
+Which dut_version / config / suite values are over-represented in each
+failure cluster, for every (cluster, value) pair at once.
+
+For each attribute, one pass builds a sparse cluster × value contingency
+table (scipy.sparse, duplicates summed). From the row / column totals,
+only the non-zero cells are scored, with vectorized NumPy / SciPy:
+- expected count E = row_total * col_total / N, lift = observed / E
+- adjusted standardized residual (Haberman) as the per-cell significance
+  score, its one-sided p-value and a Benjamini-Hochberg q-value over all
+  cells of the table
+- the table's chi-square (sum O²/E - N, so empty cells cost nothing),
+  degrees of freedom, p-value and Cramér's V
+
+Cost grows with the number of non-empty cells, not clusters × values, so
+thousands of configs and hundreds of clusters stay cheap.
+
+Input:  data/cluster/failure_clusters.csv
+Output: data/outputs/cluster_associations.csv, data/outputs/cluster_association_summary.csv
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+from schema import load_csv
+
+# Configuration
+INPUT_FILE = "data/cluster/failure_clusters.csv"
+OUTPUT_DIR = "data/outputs"
+ATTRIBUTES = ["dut_version", "config", "suite"]
+CLUSTER_COLUMN = "cluster"
+NO_CLUSTER = -1            # rows failure_clustering.py left unclustered (no real failure)
+MIN_COUNT = 5              # cells with fewer failures are not ranked
+MAX_Q_VALUE = 0.05
+TOP_N = 20
+
+
+# ==============================
+# Contingency Tables
+def contingency(clusters, values):
+    """Sparse cluster × value count matrix with its row / column labels."""
+    valid = clusters.notna().to_numpy() & values.notna().to_numpy()
+    row_codes, row_labels = pd.factorize(clusters[valid])
+    col_codes, col_labels = pd.factorize(values[valid])
+    table = sparse.coo_matrix(
+        (np.ones(len(row_codes), dtype=np.int64), (row_codes, col_codes)),
+        shape=(len(row_labels), len(col_labels)),
+    ).tocsr()
+    return table, row_labels, col_labels
+
+
+def cell_statistics(table):
+    """Per non-zero cell statistics and the table-level chi-square summary."""
+    n = table.sum()
+    row_totals = np.asarray(table.sum(axis=1)).ravel().astype(np.float64)
+    col_totals = np.asarray(table.sum(axis=0)).ravel().astype(np.float64)
+    coo = table.tocoo()
+    observed = coo.data.astype(np.float64)
+    row_share = row_totals[coo.row] / n
+    col_share = col_totals[coo.col] / n
+    expected = n * row_share * col_share
+
+    variance = expected * (1 - row_share) * (1 - col_share)
+    residual = np.divide(observed - expected, np.sqrt(variance),
+                         out=np.zeros_like(observed), where=variance > 0)
+    p_value = stats.norm.sf(residual)
+
+    # Benjamini-Hochberg over every cell; empty cells (p >= 0.5) only enlarge m
+    m = table.shape[0] * table.shape[1]
+    order = np.argsort(p_value)
+    ranked = p_value[order] * m / np.arange(1, len(order) + 1)
+    q_value = np.empty_like(p_value)
+    q_value[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+
+    chi2 = float((observed ** 2 / expected).sum() - n)
+    dof = (table.shape[0] - 1) * (table.shape[1] - 1)
+    summary = {
+        "n": int(n),
+        "clusters": table.shape[0],
+        "values": table.shape[1],
+        "nonzero_cells": int(table.nnz),
+        "chi2": chi2,
+        "dof": dof,
+        "p_value": float(stats.chi2.sf(chi2, dof)) if dof > 0 else 1.0,
+        "cramers_v": float(np.sqrt(chi2 / (n * (min(table.shape) - 1)))) if min(table.shape) > 1 else 0.0,
+    }
+    cells = {
+        "row": coo.row, "col": coo.col, "count": coo.data, "expected": expected,
+        "lift": observed / expected, "residual": residual, "p_value": p_value, "q_value": q_value,
+    }
+    return cells, summary
+
+
+# ==============================
+# Ranked Associations
+def cluster_associations(df, attributes=ATTRIBUTES, cluster_column=CLUSTER_COLUMN, min_count=MIN_COUNT):
+    """Return (ranked over-represented cells, per-attribute chi-square summary)."""
+    clusters = df[cluster_column]
+    failures = clusters.notna() & (clusters != NO_CLUSTER)
+    frames, summaries = [], []
+    for attribute in attributes:
+        if attribute not in df.columns:
+            continue
+        table, row_labels, col_labels = contingency(clusters[failures], df.loc[failures, attribute])
+        if table.nnz == 0:
+            continue
+        cells, summary = cell_statistics(table)
+        summaries.append({"attribute": attribute, **summary})
+
+        keep = (cells["count"] >= min_count) & (cells["residual"] > 0)
+        frames.append(pd.DataFrame({
+            "attribute": attribute,
+            "value": np.asarray(col_labels, dtype=object)[cells["col"][keep]],
+            "cluster": np.asarray(row_labels)[cells["row"][keep]],
+            **{k: cells[k][keep] for k in ("count", "expected", "lift", "residual", "p_value", "q_value")},
+        }))
+
+    columns = ["attribute", "value", "cluster", "count", "expected", "lift", "residual", "p_value", "q_value"]
+    ranked = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+    ranked = ranked.sort_values(["residual", "lift"], ascending=False, ignore_index=True)
+    return ranked, pd.DataFrame(summaries)
+
+
+def write_associations(df, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    ranked, summary = cluster_associations(df)
+    ranked_path = os.path.join(output_dir, "cluster_associations.csv")
+    summary_path = os.path.join(output_dir, "cluster_association_summary.csv")
+    ranked.to_csv(ranked_path, index=False)
+    summary.to_csv(summary_path, index=False)
+
+    print("Attribute association with clusters (chi-square):")
+    print(summary.to_string(index=False))
+    significant = ranked[ranked["q_value"] <= MAX_Q_VALUE]
+    print(f"\n{len(significant)} significant over-represented cells (q <= {MAX_Q_VALUE}); strongest:")
+    print(significant.head(TOP_N).to_string(index=False))
+    print(f"\nAssociations saved → {ranked_path}, {summary_path}")
+    return ranked, summary
+
+
+if __name__ == "__main__":
+    write_associations(load_csv(INPUT_FILE, columns=[CLUSTER_COLUMN, *ATTRIBUTES]))
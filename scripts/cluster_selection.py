@@ -0,0 +1,167 @@
+"""
+cluster_selection.py
+--------------------
+Automatic choice of the KMeans cluster count for failure_clustering.py.
+
+Instead of hand-tuning KMEANS_CLUSTERS, candidate k values are scored on a
+stratified sample of the message embeddings:
+- the sample keeps every stratum (e.g. taxonomy error_category) in
+  proportion to its failure count, with at least one message each
+- each candidate is a cheap KMeans fit (SEARCH_N_INIT inits, count weights)
+  scored by silhouette on the sample; inertia is recorded for the elbow rule
+- candidates run in ascending batches over a process pool and the search
+  stops once the score has been flat between consecutive candidates for
+  PATIENCE candidates, but never before k reaches EARLY_STOP_MIN_K
+- only the chosen k is then fit on the full set (by the caller)
+
+Results are saved to K_SEARCH_FILE together with a fingerprint of the
+messages; a later run over the same messages reuses the saved k.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+K_SEARCH_FILE = "data/cluster/k_search.json"
+K_MIN = 2
+K_MAX = 60
+K_STEP = 2
+SAMPLE_SIZE = 5000
+SEARCH_N_INIT = 3
+METRIC = "silhouette"       # or "elbow" (inertia knee)
+PATIENCE = 3                # consecutive flat candidates before stopping
+MIN_IMPROVEMENT = 0.005     # silhouette change (or relative inertia drop for "elbow") that is not flat
+EARLY_STOP_MIN_K = 20       # always explore up to here (the old fixed KMEANS_CLUSTERS)
+N_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+RANDOM_STATE = 42
+
+
+# ==============================
+# Sampling
+def stratified_sample(strata, weights, size=SAMPLE_SIZE, random_state=RANDOM_STATE):
+    """Indices of a sample with each stratum's share proportional to its total weight."""
+    n = len(strata)
+    if n <= size:
+        return np.arange(n)
+    rng = np.random.default_rng(random_state)
+    codes, uniques = _factorize(strata)
+    stratum_weight = np.bincount(codes, weights=weights, minlength=len(uniques))
+    stratum_size = np.bincount(codes, minlength=len(uniques))
+    quota = np.maximum(1, np.floor(size * stratum_weight / stratum_weight.sum())).astype(np.int64)
+    quota = np.minimum(quota, stratum_size)
+
+    picked = []
+    for code in range(len(uniques)):
+        members = np.flatnonzero(codes == code)
+        picked.append(rng.choice(members, quota[code], replace=False))
+    return np.sort(np.concatenate(picked))
+
+
+def _factorize(values):
+    uniques, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return codes, uniques
+
+
+# ==============================
+# Candidate Scoring (process pool)
+_sample = None
+_sample_weights = None
+
+
+def _init_worker(sample, sample_weights):
+    global _sample, _sample_weights
+    _sample, _sample_weights = sample, sample_weights
+    # One BLAS/OpenMP thread per process; parallelism comes from the pool
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+
+
+def _score_k(k):
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+
+    kmeans = KMeans(n_clusters=k, random_state=RANDOM_STATE, n_init=SEARCH_N_INIT)
+    labels = kmeans.fit_predict(_sample, sample_weight=_sample_weights)
+    silhouette = silhouette_score(_sample, labels) if len(np.unique(labels)) > 1 else -1.0
+    return {"k": k, "silhouette": float(silhouette), "inertia": float(kmeans.inertia_)}
+
+
+def _change(results, metric):
+    """Score change from the previous candidate: |silhouette delta| or relative inertia drop (elbow).
+
+    Compared with the previous candidate, not the best so far: silhouette often
+    peaks at small k and then moves, which is not a plateau.
+    """
+    if len(results) < 2:
+        return np.inf
+    if metric == "elbow":
+        prev, last = results[-2]["inertia"], results[-1]["inertia"]
+        return (prev - last) / prev if prev else 0.0
+    return abs(results[-1]["silhouette"] - results[-2]["silhouette"])
+
+
+def choose_k(results, metric=METRIC):
+    """Best silhouette, or for "elbow" the k furthest below the first→last inertia chord."""
+    if metric == "elbow" and len(results) > 2:
+        ks = np.array([r["k"] for r in results], dtype=np.float64)
+        inertia = np.array([r["inertia"] for r in results])
+        x = (ks - ks[0]) / (ks[-1] - ks[0])
+        y = (inertia - inertia[-1]) / ((inertia[0] - inertia[-1]) or 1.0)
+        return int(ks[np.argmax((1 - x) - y)])
+    return max(results, key=lambda r: r["silhouette"])["k"]
+
+
+def search_k(embeddings, weights, strata, k_min=K_MIN, k_max=K_MAX, k_step=K_STEP,
+             metric=METRIC, n_workers=N_WORKERS):
+    """Score candidate k values on a stratified sample; returns (best_k, results)."""
+    idx = stratified_sample(strata, weights)
+    sample = np.ascontiguousarray(embeddings[idx], dtype=np.float32)
+    sample_weights = np.asarray(weights, dtype=np.float64)[idx]
+    candidates = list(range(k_min, min(k_max, len(sample) - 1) + 1, k_step))
+    if not candidates:
+        return max(1, min(k_min, len(sample))), []
+    print(f"Searching k in {candidates[0]}..{candidates[-1]} on {len(sample)} sampled messages "
+          f"({n_workers} workers)...")
+
+    results, stale = [], 0
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(sample, sample_weights)) as pool:
+        for start in range(0, len(candidates), n_workers):
+            for result in pool.map(_score_k, candidates[start:start + n_workers]):
+                results.append(result)
+                print(f"  k={result['k']:>3}  silhouette={result['silhouette']:.4f}  "
+                      f"inertia={result['inertia']:.1f}")
+                stale = 0 if _change(results, metric) >= MIN_IMPROVEMENT else stale + 1
+            if stale >= PATIENCE and results[-1]["k"] >= EARLY_STOP_MIN_K:
+                print(f"Score plateaued after k={results[-1]['k']}, stopping early.")
+                break
+    return choose_k(results, metric), results
+
+
+# ==============================
+# Persistence
+def messages_fingerprint(messages, model_name):
+    h = hashlib.blake2b(model_name.encode("utf-8"), digest_size=16)
+    for msg in sorted(messages):
+        h.update(msg.encode("utf-8", errors="ignore") + b"\0")
+    return h.hexdigest()
+
+
+def load_k_search(fingerprint, path=K_SEARCH_FILE, metric=METRIC):
+    """Previously chosen k for the same messages / model / metric, else None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    if saved.get("fingerprint") != fingerprint or saved.get("metric") != metric:
+        return None
+    return saved["best_k"]
+
+
+def save_k_search(best_k, results, fingerprint, path=K_SEARCH_FILE, metric=METRIC):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "metric": metric, "best_k": best_k,
+                   "results": results}, f, indent=2)
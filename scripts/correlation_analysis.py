@@ -3,10 +3,13 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from schema import fill_category, load_csv
+from cluster_association import write_associations
 # Configuration
 PREFERRED_PATH = "data/clusters/failure_clusters.csv"
 FALLBACK_PATH = "data/cluster/failure_clusters.csv"
 OUTPUT_DIR = "data/outputs"
+INPUT_COLUMNS = ["cluster", "dut_version", "config", "suite", "run_date"]
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -41,7 +44,7 @@ def analyze_failure_correlations():
     print(f"\n🔍 Starting correlation analysis from: {input_file}\n")
 
     # Load dataset
-    df = pd.read_csv(input_file)
+    df = load_csv(input_file, columns=INPUT_COLUMNS)
     print(f"Loaded {df.shape[0]} rows, {df.shape[1]} columns")
     print("Available columns:", df.columns.tolist())
 
@@ -51,10 +54,13 @@ def analyze_failure_correlations():
             print(f"Missing column '{col}' → creating placeholder.")
             df[col] = "Unknown"
 
+    # Which versions / configs / suites are over-represented per cluster (chi-square, lift)
+    write_associations(df, OUTPUT_DIR)
+
     # Fill missing values
-    df["dut_version"] = df["dut_version"].fillna("Unknown")
-    df["config"] = df["config"].fillna("Unknown")
-    df["cluster"] = df["cluster"].fillna("Unknown")
+    df["dut_version"] = fill_category(df["dut_version"], "Unknown")
+    df["config"] = fill_category(df["config"], "Unknown")
+    df["cluster"] = fill_category(df["cluster"], "Unknown")
 
     #Cluster frequency summary 
     cluster_counts = df["cluster"].value_counts().reset_index()
@@ -87,10 +93,11 @@ def analyze_failure_correlations():
     save_plot(fig, "clusters_by_config.png")
 
     #Visualization: Trend Over Time
-    df["run_date"] = pd.to_datetime(df["run_date"], errors="coerce")
+    # Already datetime64 from load_csv; this only converts a placeholder column
+    df["run_date"] = pd.to_datetime(df["run_date"], format="ISO8601", errors="coerce")
     if df["run_date"].notna().any():
         trend = (
-            df.groupby([df["run_date"].dt.to_period("M"), "cluster"])
+            df.groupby([df["run_date"].dt.to_period("M"), "cluster"], observed=True)
             .size()
             .unstack(fill_value=0)
         )
@@ -0,0 +1,223 @@
+"""
+data_profiler.py
+----------------
+Single-pass, chunked data profiler for the preprocessed log CSV.
+
+Computes everything Data_Profiling_and_Report.ipynb reports (missing values,
+duplicates, coverage, critical-field coverage, gaps) in one pass over
+CHUNK_SIZE-row chunks, so memory does not depend on row count:
+- null / non-null counts and coverage per column
+- approximate distinct count per column (HyperLogLog)
+- approximate duplicate-row rate (HyperLogLog over row hashes); a shortfall
+  of distinct rows within DUPLICATE_SIGMAS standard errors of the sketch is
+  reported as 0 ("below detection limit"), not as duplicates
+- top-k values per column (mergeable Misra-Gries summary)
+- min / max of timestamp columns
+
+Input:  data/logs_preprocessed.csv
+Output: data/profile/profile_report.json, data/profile/profile_report.html
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Configuration
+INPUT_FILE = "C:/Users/hemalatha/Desktop/attest-eda/data/logs_preprocessed.csv"
+OUTPUT_DIR = "data/profile"
+CHUNK_SIZE = 200_000
+HLL_PRECISION = 14          # 2^14 registers per column, ~0.8% standard error
+DUPLICATE_SIGMAS = 3        # HLL standard errors a shortfall must exceed to count as duplicates
+TOP_K = 10
+TOP_K_CAPACITY = 100        # counters kept per column before pruning
+TIMESTAMP_COLUMNS = ["timestamp", "run_date"]
+CRITICAL_FIELDS = ["test_case_id", "dut", "suite", "config", "error_msg", "error_msg_id",
+                   "status", "run_date", "timestamp"]
+
+
+# ==============================
+# Sketches
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        """Add an array of uint64 hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+        rest_bits = 64 - self.p
+        idx = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        # rest < 2^50 is exact in float64, so floor(log2) gives the top set bit
+        rank = np.full(hashes.shape, rest_bits + 1, dtype=np.uint8)
+        nonzero = rest > 0
+        rank[nonzero] = rest_bits - np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def relative_error(self):
+        """Standard error of count() relative to the true cardinality."""
+        return 1.04 / np.sqrt(self.m)
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * np.log(self.m / zeros)   # small-range (linear counting) correction
+        return int(round(estimate))
+
+
+class TopK:
+    """Mergeable Misra-Gries summary: counts are lower bounds, error <= N / capacity."""
+
+    def __init__(self, capacity=TOP_K_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+
+    def update(self, value_counts):
+        for value, n in value_counts.items():
+            self.counts[value] = self.counts.get(value, 0) + int(n)
+        if len(self.counts) > self.capacity:
+            ordered = sorted(self.counts.values(), reverse=True)
+            cut = ordered[self.capacity]
+            self.counts = {v: n - cut for v, n in self.counts.items() if n > cut}
+
+    def top(self, k=TOP_K):
+        return sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+
+# ==============================
+# Profiling
+def profile_csv(input_file, chunk_size=CHUNK_SIZE):
+    total_rows = 0
+    columns = None
+    nulls, distinct, topk, ts_min, ts_max = {}, {}, {}, {}, {}
+    rows_hll = HyperLogLog()
+
+    for chunk in pd.read_csv(input_file, chunksize=chunk_size, dtype=str):
+        if columns is None:
+            columns = chunk.columns.tolist()
+            for col in columns:
+                nulls[col] = 0
+                distinct[col] = HyperLogLog()
+                topk[col] = TopK()
+        total_rows += len(chunk)
+        rows_hll.add_hashes(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+
+        for col in columns:
+            series = chunk[col]
+            nulls[col] += int(series.isna().sum())
+            present = series.dropna()
+            distinct[col].add_hashes(pd.util.hash_pandas_object(present, index=False).to_numpy())
+            topk[col].update(present.value_counts())
+
+            if col in TIMESTAMP_COLUMNS:
+                parsed = pd.to_datetime(present, format="ISO8601", errors="coerce").dropna()
+                if not parsed.empty:
+                    lo, hi = parsed.min(), parsed.max()
+                    ts_min[col] = lo if col not in ts_min else min(ts_min[col], lo)
+                    ts_max[col] = hi if col not in ts_max else max(ts_max[col], hi)
+
+    if columns is None:
+        raise ValueError(f"No rows found in {input_file}")
+
+    # HLL can under-count; only a shortfall beyond the sketch's error bound means duplicates
+    shortfall = total_rows - min(rows_hll.count(), total_rows)
+    detection_limit = int(np.ceil(DUPLICATE_SIGMAS * rows_hll.relative_error() * total_rows))
+    duplicates = shortfall if shortfall > detection_limit else 0
+    report = {
+        "input_file": input_file,
+        "rows": total_rows,
+        "columns": len(columns),
+        "approx_duplicate_rows": duplicates,
+        "approx_duplicate_rate": duplicates / total_rows if total_rows else 0.0,
+        "duplicate_detection_limit": detection_limit,
+        "duplicates_below_detection_limit": duplicates == 0,
+        "duplicate_note": (f"Approximate (HyperLogLog, p={rows_hll.p}); shortfalls up to "
+                           f"{DUPLICATE_SIGMAS} standard errors ({detection_limit} rows) are reported as 0."),
+        "column_profiles": [],
+    }
+    for col in columns:
+        non_null = total_rows - nulls[col]
+        profile = {
+            "column": col,
+            "missing_count": nulls[col],
+            "missing_pct": 100 * nulls[col] / total_rows if total_rows else 0.0,
+            "non_null_count": non_null,
+            "coverage_pct": 100 * non_null / total_rows if total_rows else 0.0,
+            "approx_distinct": min(distinct[col].count(), non_null),
+            "top_values": [[v, n] for v, n in topk[col].top()],
+            "critical": col in CRITICAL_FIELDS,
+        }
+        if col in ts_min:
+            profile["min"] = ts_min[col].isoformat()
+            profile["max"] = ts_max[col].isoformat()
+        report["column_profiles"].append(profile)
+    report["gaps"] = find_gaps(report)
+    return report
+
+
+def find_gaps(report):
+    """Same quality-gap checks as the notebook, from the collected metrics."""
+    by_col = {p["column"]: p for p in report["column_profiles"]}
+    gaps = []
+    if "dut_version" in by_col and by_col["dut_version"]["missing_count"] > 0:
+        gaps.append("DUT Version has missing values → may not be reliable for ML.")
+    if "os_version" in by_col and by_col["os_version"]["missing_count"] > 0:
+        gaps.append(f"OS Version missing in {by_col['os_version']['missing_count']} rows → need better extraction.")
+    for col in ("error_msg", "error_msg_id"):
+        if col in by_col and by_col[col]["missing_count"] > 0:
+            gaps.append("Some logs have no error messages.")
+    if report["approx_duplicate_rows"] > 0:
+        gaps.append("Dataset has (approximately) duplicate rows, consider removing them.")
+    return gaps
+
+
+# ==============================
+# Reports
+def write_reports(report, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = os.path.join(output_dir, "profile_report.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+
+    columns = pd.DataFrame(report["column_profiles"])
+    columns["top_values"] = columns["top_values"].apply(
+        lambda tv: ", ".join(f"{v} ({n})" for v, n in tv[:5])
+    )
+    html = [
+        "<html><head><meta charset='utf-8'><title>Data Profile</title></head><body>",
+        f"<h1>Data Profile: {report['input_file']}</h1>",
+        f"<p>Rows: {report['rows']} &nbsp; Columns: {report['columns']} &nbsp; "
+        + (f"Approx. duplicate rows: below detection limit (&le; {report['duplicate_detection_limit']})</p>"
+           if report["duplicates_below_detection_limit"] else
+           f"Approx. duplicate rows: {report['approx_duplicate_rows']} "
+           f"({100 * report['approx_duplicate_rate']:.2f}%)</p>"),
+        "<h2>Columns</h2>",
+        columns.sort_values("coverage_pct").to_html(index=False, float_format="%.2f"),
+        "<h2>Critical Fields Coverage (ML readiness)</h2>",
+        columns[columns["critical"]][["column", "non_null_count", "coverage_pct"]].to_html(
+            index=False, float_format="%.2f"),
+        "<h2>Potential Gaps to Fix</h2><ul>",
+        *[f"<li>{gap}</li>" for gap in report["gaps"]],
+        "</ul></body></html>",
+    ]
+    html_path = os.path.join(output_dir, "profile_report.html")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(html))
+    return json_path, html_path
+
+
+if __name__ == "__main__":
+    print("Profiling dataset in one chunked pass...")
+    report = profile_csv(INPUT_FILE)
+    json_path, html_path = write_reports(report)
+    print(f"Rows: {report['rows']}, approx. duplicate rate: {100 * report['approx_duplicate_rate']:.2f}%")
+    print("\nPotential Gaps to Fix:")
+    for gap in report["gaps"]:
+        print(f"- {gap}")
+    print(f"\nProfile saved → {json_path}, {html_path}")
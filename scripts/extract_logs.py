@@ -1,28 +1,57 @@
 import os
 import tarfile
 from datetime import datetime
+from archive_index import build_archive_index
+from file_dedup import check_and_mark, load_seen_hashes, save_seen_hashes
 tar_file = "C:/Users/hemalatha/Desktop/attest-eda/raw_logs/Attest_Archive_2025_Sep_22_10_25_01.tar.gz"
 extract_path = "C:/Users/hemalatha/Desktop/attest-eda/data/raw"
-with tarfile.open(tar_file,"r:gz") as tar:
-    for member in tar.getmembers():
-        if member.isfile():
-            filename = os.path.basename(member.name)
-            date_str = None
-            base, _ = os.path.splitext(filename)
-            for token in base.split("_"):
-                if token.isdigit() and len(token)==8:
-                    date_str = token
-                    break
-            if date_str:
-                try:
-                    run_date=datetime.strptime(date_str,"%Y%m%d").strftime("%Y-%m-%d")
-                except:
-                    run_date="unknown_date"
-            else:
-                run_date="unknown_date"
-            parts = base.split("_")
-            suite_name = parts[2] if len(parts) > 2 else "unknown_suite"
-            target_dir = os.path.join(extract_path,run_date,suite_name)
-            os.makedirs(target_dir,exist_ok=True)
-            tar.extract(member,target_dir)
+# Content hashes of every member already extracted, shared across nightly archives
+seen_hashes_file = os.path.join(extract_path, ".seen_log_hashes")
+seen = load_seen_hashes(seen_hashes_file)
+counts = {"extracted": 0, "skipped": 0, "unsafe": 0}
+
+def extract_member(member, tar):
+    filename = os.path.basename(member.name)
+    date_str = None
+    base, _ = os.path.splitext(filename)
+    for token in base.split("_"):
+        if token.isdigit() and len(token)==8:
+            date_str = token
+            break
+    if date_str:
+        try:
+            run_date=datetime.strptime(date_str,"%Y%m%d").strftime("%Y-%m-%d")
+        except:
+            run_date="unknown_date"
+    else:
+        run_date="unknown_date"
+    parts = base.split("_")
+    suite_name = parts[2] if len(parts) > 2 else "unknown_suite"
+    target_dir = os.path.join(extract_path,run_date,suite_name)
+    # Members are written by hand, so apply tarfile's "data" filter (no absolute
+    # paths, no ".." escaping target_dir) before touching the disk
+    try:
+        member = tarfile.data_filter(member, target_dir)
+    except tarfile.FilterError as e:
+        print(f"Skipping unsafe archive member {member.name!r}: {e}")
+        counts["unsafe"] += 1
+        return
+    data = tar.extractfile(member).read()
+    if check_and_mark(data, seen):
+        counts["skipped"] += 1
+        return
+    # Write the bytes already read for hashing instead of re-reading the member
+    target_path = os.path.join(target_dir, member.name)
+    os.makedirs(os.path.dirname(target_path),exist_ok=True)
+    with open(target_path,"wb") as out:
+        out.write(data)
+    counts["extracted"] += 1
+
+# One pass over the archive: extract new members and build the random-access
+# sidecar index (<tar>.idx.json / <tar>.gzidx) used by archive_index.fetch_member
+build_archive_index(tar_file, on_member=extract_member)
+save_seen_hashes(seen_hashes_file, seen)
 print("Logs are extracted:",extract_path)
+print(f"Extracted {counts['extracted']} files, skipped {counts['skipped']} duplicates already seen")
+if counts["unsafe"]:
+    print(f"Refused {counts['unsafe']} members with paths outside the extraction folder")
@@ -2,9 +2,11 @@
 failure_clustering.py
 ----------------------
 Failure Signature Generation with BERT embeddings:
-- Excludes "no_error" rows from clustering
-- Convert real failure logs into dense vectors using BERT
-- Cluster similar messages using KMeans
+- Excludes PASS / "No Error" rows from clustering
+- Collapse failure rows to unique messages with counts
+- Convert unique failure messages into dense vectors using BERT
+- Cluster similar messages using count-weighted KMeans (k fixed, or
+  chosen by a sampled parallel search with auto_k, see cluster_selection.py)
 - Detect top recurring error keywords per cluster
 
 Input:  data/features/failure_features.csv
@@ -16,70 +18,109 @@ import pandas as pd
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sentence_transformers import SentenceTransformer
+from cluster_selection import load_k_search, messages_fingerprint, save_k_search, search_k
+from line_store import attach_error_msgs, load_error_msg_table
+from taxonomy import load_taxonomy
+from schema import load_csv, write_csv
 
 # Config
 INPUT_FILE = "data/features/failure_features.csv"
+# Columns used here plus those needed by correlation_analysis.py
+INPUT_COLUMNS = [
+    "filename", "dut", "dut_version", "config", "test_case_id", "suite",
+    "status", "timestamp", "run_date", "error_msg", "error_msg_id",
+]
 #OUTPUT_FILE = "data/features/failure_clusters_bert.csv"
 OUTPUT_DIR = "data/cluster"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "failure_clusters.csv")
 
 TOP_KEYWORDS = 7        # Number of keywords to show per cluster
-KMEANS_CLUSTERS = 20
+KMEANS_CLUSTERS = 20    # used unless auto_k is set
+AUTO_K = False          # search k on a sample of the embeddings instead (saved for later runs)
 BERT_MODEL = "all-MiniLM-L6-v2"  # lightweight, fast sentence-transformer
 
 os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
 
 
-def cluster_failures_bert():
+def cluster_failures_bert(auto_k=AUTO_K, input_file=INPUT_FILE, output_file=OUTPUT_FILE):
     print("Loading dataset...")
-    df = pd.read_csv(INPUT_FILE)
+    df = load_csv(input_file, columns=INPUT_COLUMNS)
     print(f"Loaded dataset: {df.shape[0]} rows, {df.shape[1]} columns")
 
-    # Ensure error message column exists
+    # Materialize error messages from the string table written next to the features
+    if "error_msg" not in df.columns and "error_msg_id" in df.columns:
+        df = attach_error_msgs(df, load_error_msg_table(input_file))
     if "error_msg" not in df.columns:
         raise ValueError("Column 'error_msg' not found in dataset.")
     df["error_msg"] = df["error_msg"].fillna("")
 
     # ==============================
-    # Separate real failures vs no_error
-    df["is_failure"] = df["error_msg"].apply(lambda x: 0 if str(x).lower() == "No Error" else 1)
-    df_failures = df[df["is_failure"] == 1].copy()
+    # Separate real failures vs no_error (PASS rows are never failures)
+    is_failure = (df["error_msg"] != "") & (df["error_msg"].str.strip().str.lower() != "no error")
+    if "status" in df.columns:
+        is_failure &= df["status"].astype("string").str.upper() != "PASS"
+    df["is_failure"] = is_failure.fillna(False).astype("int8")
+    df_failures = df[df["is_failure"] == 1]
 
     if df_failures.empty:
         raise ValueError("No real failures found for clustering!")
 
+    # ==============================
+    # Collapse to unique messages; counts become KMeans sample weights
+    msg_codes, unique_msgs = pd.factorize(df_failures["error_msg"])
+    msg_counts = np.bincount(msg_codes, minlength=len(unique_msgs)).astype(np.float64)
+    print(f"{df_failures.shape[0]} failure rows → {len(unique_msgs)} unique messages")
+
     # ==============================
     # BERT embeddings
-    print(f"Encoding {df_failures.shape[0]} failure messages using BERT model: {BERT_MODEL} ...")
+    print(f"Encoding {len(unique_msgs)} unique failure messages using BERT model: {BERT_MODEL} ...")
+    # Imported here: sentence_transformers pulls in torch, which only this step needs
+    from sentence_transformers import SentenceTransformer
     model = SentenceTransformer(BERT_MODEL)
-    embeddings = model.encode(df_failures["error_msg"].tolist(), show_progress_bar=True, convert_to_numpy=True)
+    embeddings = model.encode(list(unique_msgs), show_progress_bar=True, convert_to_numpy=True)
+
+    # ==============================
+    # Number of clusters (fixed, saved search result, or new sampled search)
+    n_clusters = min(KMEANS_CLUSTERS, len(unique_msgs))
+    if auto_k:
+        fingerprint = messages_fingerprint(unique_msgs, BERT_MODEL)
+        saved_k = load_k_search(fingerprint)
+        if saved_k is not None:
+            n_clusters = saved_k
+            print(f"Reusing saved k={n_clusters} for these messages")
+        else:
+            # Stratify the sample by taxonomy category so rare failure types stay represented
+            strata = load_taxonomy("error_category").classify_many(list(unique_msgs), default="uncategorized")
+            n_clusters, results = search_k(embeddings, msg_counts, strata)
+            save_k_search(n_clusters, results, fingerprint)
+            print(f"Selected k={n_clusters}")
 
     # ==============================
     # KMeans clustering
-    print(f"Clustering embeddings with KMeans (k={KMEANS_CLUSTERS})...")
-    kmeans = KMeans(n_clusters=KMEANS_CLUSTERS, random_state=42, n_init=10)
-    cluster_labels = kmeans.fit_predict(embeddings)
+    print(f"Clustering embeddings with KMeans (k={n_clusters})...")
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    unique_labels = kmeans.fit_predict(embeddings, sample_weight=msg_counts)
 
-    # Assign clusters back to df
+    # Broadcast labels back to rows by message code
     df["cluster"] = -1  # default for no_error rows
-    df.loc[df_failures.index, "cluster"] = cluster_labels
+    df.loc[df_failures.index, "cluster"] = unique_labels[msg_codes]
 
     # ==============================
-    # Top keywords per cluster (TF-IDF)
+    # Top keywords per cluster (TF-IDF over unique messages, count-weighted means)
     print("Extracting top keywords per cluster using TF-IDF...")
     vectorizer = TfidfVectorizer(max_features=3000, stop_words="english")
-    X_tfidf = vectorizer.fit_transform(df_failures["error_msg"])
+    X_tfidf = vectorizer.fit_transform(unique_msgs)
     feature_names = np.array(vectorizer.get_feature_names_out())
 
     top_keywords_per_cluster = {}
-    for cluster_num in range(KMEANS_CLUSTERS):
-        cluster_indices = np.where(cluster_labels == cluster_num)[0]
+    for cluster_num in range(n_clusters):
+        cluster_indices = np.where(unique_labels == cluster_num)[0]
         if len(cluster_indices) == 0:
             top_keywords_per_cluster[cluster_num] = []
             continue
-        cluster_tfidf = X_tfidf[cluster_indices].mean(axis=0)
+        weights = msg_counts[cluster_indices]
+        cluster_tfidf = X_tfidf[cluster_indices].T @ weights / weights.sum()
         top_indices = np.asarray(cluster_tfidf).flatten().argsort()[::-1][:TOP_KEYWORDS]
         top_keywords = feature_names[top_indices].tolist()
         top_keywords_per_cluster[cluster_num] = top_keywords
@@ -87,8 +128,9 @@ def cluster_failures_bert():
 
     # ==============================
     # Save results
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"\nFailure clusters with BERT saved → {OUTPUT_FILE}")
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    write_csv(df, output_file)
+    print(f"\nFailure clusters with BERT saved → {output_file}")
 
     return df, top_keywords_per_cluster
 
@@ -5,59 +5,65 @@ Generates derived features from standardized ATTEST logs
 to support failure pattern detection (Task 2).
 
 Input:  data/logs_preprocessed.csv
-Output: data/features/failure_features.csv
+Output: data/features/failure_features.csv (+ .error_msgs.csv for error_msg_id)
 Memory-efficient version for very large datasets.
 """
 
 import os
 import pandas as pd
+from line_store import load_error_msg_table, load_run_table, write_error_msg_table
+from window_features import add_window_features
+from schema import load_csv, write_csv
 
 # Configuration
 INPUT_FILE = "C:/Users/hemalatha/Desktop/attest-eda/data/logs_preprocessed.csv"
 OUTPUT_DIR = "data/features"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "failure_features.csv")
+# Columns used here plus those carried forward to clustering / correlation analysis
+INPUT_COLUMNS = [
+    "filename", "dut", "dut_version", "config", "test_case_id", "suite",
+    "status", "timestamp", "run_date", "error_msg", "error_msg_id", "execution_duration",
+]
 
 
-def generate_features():
+def generate_features(input_file=INPUT_FILE, output_file=OUTPUT_FILE):
     print("Starting feature engineering...")
 
-    # Load dataset
-    df = pd.read_csv(INPUT_FILE)
+    # Load dataset (typed, projected; timestamp is already datetime64)
+    df = load_csv(input_file, columns=INPUT_COLUMNS)
     print(f"Loaded dataset: {df.shape[0]} rows, {df.shape[1]} columns")
+    # String table behind error_msg_id, read together with the rows that reference it
+    msg_table = load_error_msg_table(input_file, column=None) if "error_msg_id" in df.columns else None
 
-    # Normalize status column
-    df["status"] = df["status"].astype(str).str.strip().str.upper()
-
-    # Ensure timestamp is datetime
-    if "timestamp" in df.columns:
-        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    # Normalize status column (per category, not per row)
+    df["status"] = df["status"].map(lambda x: str(x).strip().upper()).astype("category")
 
     # ==============================
     # Failure Frequency per Suite and DUT
     fail_df = df[df["status"] == "FAIL"]
 
-    suite_fail_freq = fail_df.groupby("suite")["status"].count().rename("failure_freq_suite")
-    dut_fail_freq = fail_df.groupby("dut")["status"].count().rename("failure_freq_dut")
+    suite_fail_freq = fail_df.groupby("suite", observed=True)["status"].count().rename("failure_freq_suite")
+    dut_fail_freq = fail_df.groupby("dut", observed=True)["status"].count().rename("failure_freq_dut")
 
     df = df.merge(suite_fail_freq, on="suite", how="left")
     df = df.merge(dut_fail_freq, on="dut", how="left")
 
-    df["failure_freq_suite"].fillna(0, inplace=True)
-    df["failure_freq_dut"].fillna(0, inplace=True)
+    df["failure_freq_suite"] = df["failure_freq_suite"].fillna(0)
+    df["failure_freq_dut"] = df["failure_freq_dut"].fillna(0)
 
     # Failure Ratio per suite
-    total_suite = df.groupby("suite")["status"].count().rename("total_runs_suite")
+    total_suite = df.groupby("suite", observed=True)["status"].count().rename("total_runs_suite")
     df = df.merge(total_suite, on="suite", how="left")
     df["failure_ratio_suite"] = df["failure_freq_suite"] / df["total_runs_suite"]
 
     # ==============================
     # Time Since Last Failure (memory-efficient)
     df = df.sort_values(["dut", "timestamp"])
-    df["time_since_last_failure"] = 0
+    df["time_since_last_failure"] = 0.0
 
     print("Calculating time_since_last_failure per DUT...")
-    for dut, group in df.groupby("dut"):
+    for dut, group in df.groupby("dut", observed=True):
         last_fail_time = None
         times = []
         for ts, status in zip(group["timestamp"], group["status"]):
@@ -74,20 +80,31 @@ def generate_features():
                 times.append(0)
         df.loc[group.index, "time_since_last_failure"] = times
 
+    # ==============================
+    # Trailing-window failure counts / rates per DUT, suite and test case (1h / 24h / 7d)
+    print("Calculating rolling-window failure features...")
+    df = add_window_features(df)
+
     # ==============================
     # Average Execution Duration per Suite
-    if "execution_duration" in df.columns:
-        avg_duration = df.groupby("suite")["execution_duration"].mean().rename("avg_exec_duration_suite")
+    # Averaged per run (not per row) from the parser's per-run table, <input>.runs.csv
+    runs = load_run_table(input_file, columns=["suite", "execution_duration"])
+    if runs is not None:
+        avg_duration = runs.groupby("suite", observed=True)["execution_duration"].mean().rename("avg_exec_duration_suite")
+        df = df.merge(avg_duration.reset_index().astype({"suite": df["suite"].dtype}), on="suite", how="left")
+    elif "execution_duration" in df.columns:
+        avg_duration = df.groupby("suite", observed=True)["execution_duration"].mean().rename("avg_exec_duration_suite")
         df = df.merge(avg_duration, on="suite", how="left")
 
     # ==============================
     # Encode Config/Environment Info
     if "config" in df.columns:
-        df["config_hash"] = df["config"].astype(str).apply(lambda x: abs(hash(x)) % (10 ** 8))
+        # Hash each distinct config once (categorical map)
+        df["config_hash"] = df["config"].astype("category").map(lambda x: abs(hash(str(x))) % (10 ** 8)).astype("Int64")
 
     # ==============================
-    # Recent Failure Indicator
-    df["recent_failure_flag"] = df["status"].apply(lambda x: 1 if x == "FAIL" else 0)
+    # Recent Failure Indicator: the test case failed in the 24h before this run
+    df["recent_failure_flag"] = (df["fail_count_test_case_id_24h"] > 0).astype("int8")
 
     # ==============================
     # Fill Remaining Missing Values
@@ -100,8 +117,11 @@ def generate_features():
     }, inplace=True)
 
     # Save features
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"Feature dataset saved → {OUTPUT_FILE}")
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    write_csv(df, output_file)
+    if msg_table is not None:
+        write_error_msg_table(msg_table, output_file)
+    print(f"Feature dataset saved → {output_file}")
     print("Feature engineering complete!\n")
 
     return df
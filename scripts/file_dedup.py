@@ -0,0 +1,58 @@
+"""
+file_dedup.py
+-------------
+Content-hash deduplication for log files across overlapping archives.
+
+The same tc_*_<date>-<time>.log shows up in several nightly tarballs.
+Each file / tar member is hashed once as it is read and checked against a
+seen-set (optionally persisted to disk), so identical files are never
+extracted, parsed or stored twice. dedupe_rows() is a row-level fallback
+for frames that were built without file-level dedupe.
+"""
+
+import hashlib
+import os
+import pandas as pd
+
+HASH_DIGEST_SIZE = 16
+
+
+def content_hash(data: bytes):
+    """Hex digest identifying a file by its bytes."""
+    return hashlib.blake2b(data, digest_size=HASH_DIGEST_SIZE).hexdigest()
+
+
+def load_seen_hashes(path):
+    """Load the persistent seen-set (one hex digest per line); empty if missing."""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def save_seen_hashes(path, seen):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(sorted(seen)))
+    os.replace(tmp_path, path)
+
+
+def check_and_mark(data: bytes, seen):
+    """Return True if `data` was already seen; otherwise record it and return False."""
+    digest = content_hash(data)
+    if digest in seen:
+        return True
+    seen.add(digest)
+    return False
+
+
+# Columns that identify a parsed log line; raw_line is not needed to tell rows apart
+ROW_KEY_COLUMNS = ["filename", "line_number", "timestamp", "status", "error_msg"]
+
+
+def dedupe_rows(df, subset=None):
+    """Drop duplicate rows by a 64-bit hash of `subset` columns (fallback to file-level dedupe)."""
+    subset = [c for c in (subset or ROW_KEY_COLUMNS) if c in df.columns]
+    row_hashes = pd.util.hash_pandas_object(df[subset], index=False)
+    return df[~row_hashes.duplicated().to_numpy()].reset_index(drop=True)
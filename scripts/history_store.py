@@ -0,0 +1,170 @@
+"""
+history_store.py
+----------------
+Indexed per-test-case run history with incremental flakiness scoring.
+
+Keyed by (test_case_id, dut, config). Ingestion feeds each parsed log file
+(one run) through update_frame(); every key keeps:
+- its time-ordered outcome sequence (PASS / FAIL / ABORT per run)
+- running counts, pass→fail transitions, total flips, last failure time
+
+Runs can arrive out of time order; a run is inserted by bisection and the
+flip counts are patched from its two neighbours, so nothing is rescanned.
+flakiness() / recent_outcomes() are O(1) / O(n) dict lookups and
+top_flaky() ranks keys, never rows.
+
+The store is persisted as JSON between nightly runs; run filenames already
+recorded are ignored, so re-ingesting the same tree does not double count.
+Queries only need the standard library (no pandas import), so the CLI's
+`query` subcommand starts fast.
+"""
+
+import bisect
+import heapq
+import json
+import os
+from datetime import datetime, timezone
+
+KEY_COLUMNS = ["test_case_id", "dut", "config"]
+MIN_RUNS = 5        # runs needed before a key is ranked as flaky
+FAILED = ("FAIL", "ABORT")
+
+
+class HistoryStore:
+    def __init__(self, path=None):
+        self.path = path
+        # key -> {"times": [ns], "outcomes": [str], "runs", "fails", "pass_to_fail", "flips", "last_failure"}
+        self.entries = {}
+        self.seen_runs = set()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    # ==============================
+    # Updates
+    def add_run(self, key, time_ns, outcome, run_id=None):
+        """Record one run outcome for `key` at `time_ns` (int64 ns)."""
+        if run_id is not None:
+            if run_id in self.seen_runs:
+                return
+            self.seen_runs.add(run_id)
+
+        e = self.entries.get(key)
+        if e is None:
+            e = self.entries[key] = {"times": [], "outcomes": [], "runs": 0, "fails": 0,
+                                     "pass_to_fail": 0, "flips": 0, "last_failure": None}
+        pos = bisect.bisect_right(e["times"], time_ns)
+        before = e["outcomes"][pos - 1] if pos > 0 else None
+        after = e["outcomes"][pos] if pos < len(e["outcomes"]) else None
+
+        # Replace the before→after edge with before→outcome→after
+        if before is not None and after is not None:
+            e["flips"] -= _flip(before, after)
+            e["pass_to_fail"] -= _pass_to_fail(before, after)
+        if before is not None:
+            e["flips"] += _flip(before, outcome)
+            e["pass_to_fail"] += _pass_to_fail(before, outcome)
+        if after is not None:
+            e["flips"] += _flip(outcome, after)
+            e["pass_to_fail"] += _pass_to_fail(outcome, after)
+
+        e["times"].insert(pos, time_ns)
+        e["outcomes"].insert(pos, outcome)
+        e["runs"] += 1
+        if outcome in FAILED:
+            e["fails"] += 1
+            if e["last_failure"] is None or time_ns > e["last_failure"]:
+                e["last_failure"] = time_ns
+
+    def update_frame(self, frame):
+        """Add one parsed log file: each key's run outcome is its last status line."""
+        import pandas as pd
+
+        rows = frame[frame["status"].notna()]
+        if rows.empty:
+            return
+        rows = rows.assign(run_time=rows["timestamp"].fillna(rows["run_date"]))
+        for key, group in rows.groupby(KEY_COLUMNS, observed=True, sort=False, dropna=False):
+            group = group.sort_values("line_number")
+            run_time = group["run_time"].min()
+            if pd.isna(run_time):
+                continue
+            key = tuple(None if pd.isna(k) else str(k) for k in key)
+            run_id = f"{group['filename'].iloc[0]}|{'|'.join(map(str, key))}"
+            self.add_run(key, int(run_time.value), str(group["status"].iloc[-1]), run_id)
+
+    # ==============================
+    # Queries
+    def flakiness(self, test_case_id, dut, config):
+        """Flakiness summary for one key; flakiness = flips / (runs - 1)."""
+        e = self.entries.get((test_case_id, dut, config))
+        if e is None:
+            return None
+        return _summary((test_case_id, dut, config), e)
+
+    def recent_outcomes(self, test_case_id, dut, config, n=10):
+        """Most recent `n` (ISO timestamp, outcome) pairs, newest first."""
+        e = self.entries.get((test_case_id, dut, config))
+        if e is None:
+            return []
+        return [(_iso(t), o) for t, o in zip(e["times"][-n:][::-1], e["outcomes"][-n:][::-1])]
+
+    def top_flaky(self, n=20, min_runs=MIN_RUNS):
+        """Summaries of the keys ranked by flakiness score (ties broken by pass→fail transitions)."""
+        candidates = (
+            (key, e) for key, e in self.entries.items() if e["runs"] >= min_runs and e["flips"]
+        )
+        best = heapq.nlargest(
+            n, candidates, key=lambda ke: (_score(ke[1]), ke[1]["pass_to_fail"])
+        )
+        return [_summary(key, e) for key, e in best]
+
+    # ==============================
+    # Persistence
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {
+            "entries": [[list(key), e] for key, e in self.entries.items()],
+            "seen_runs": sorted(self.seen_runs),
+        }
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        self.entries = {tuple(key): e for key, e in payload["entries"]}
+        self.seen_runs = set(payload["seen_runs"])
+        return self
+
+
+def _flip(a, b):
+    return int((a in FAILED) != (b in FAILED))
+
+
+def _pass_to_fail(a, b):
+    return int(a not in FAILED and b in FAILED)
+
+
+def _iso(time_ns):
+    return datetime.fromtimestamp(time_ns / 1e9, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def _score(e):
+    return e["flips"] / (e["runs"] - 1) if e["runs"] > 1 else 0.0
+
+
+def _summary(key, e):
+    return {
+        "test_case_id": key[0],
+        "dut": key[1],
+        "config": key[2],
+        "runs": e["runs"],
+        "fails": e["fails"],
+        "fail_rate": e["fails"] / e["runs"] if e["runs"] else 0.0,
+        "pass_to_fail": e["pass_to_fail"],
+        "flips": e["flips"],
+        "flakiness": _score(e),
+        "last_failure": _iso(e["last_failure"]) if e["last_failure"] is not None else None,
+    }
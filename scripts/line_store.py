@@ -0,0 +1,149 @@
+"""
+line_store.py
+-------------
+Compact storage for the text columns of parsed log rows.
+
+Rows written by the pipeline no longer carry `raw_line` or `error_msg` text:
+- raw_line  → (file_id, raw_offset, raw_length) byte reference into the
+              original log file, listed in the <output>.files.csv table
+- error_msg → error_msg_id into a deduplicated string table,
+              <output>.error_msgs.csv, which also holds each message's
+              error_category (taxonomy_rules.json, classified once per message)
+
+The per-run summaries from log_parsers (one row per log file, keyed by
+file_id) are written next to them as <output>.runs.csv.
+
+Text is materialized only when asked for, with attach_error_msgs() and
+materialize_raw_lines().
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from taxonomy import load_taxonomy
+from schema import RUN_COLUMNS, load_csv, write_csv
+
+FILE_TABLE_SUFFIX = ".files.csv"
+ERROR_MSG_TABLE_SUFFIX = ".error_msgs.csv"
+RUN_TABLE_SUFFIX = ".runs.csv"
+
+
+def side_table_paths(csv_path):
+    base, _ = os.path.splitext(csv_path)
+    return base + FILE_TABLE_SUFFIX, base + ERROR_MSG_TABLE_SUFFIX
+
+
+def run_table_path(csv_path):
+    return os.path.splitext(csv_path)[0] + RUN_TABLE_SUFFIX
+
+
+# ==============================
+# References
+def line_refs(data: bytes, line_numbers):
+    """Byte (offset, length) of each 1-based line number in `data`, vectorized."""
+    newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+    line_ends = np.append(newlines, len(data))
+    idx = np.asarray(line_numbers, dtype=np.int64) - 1
+    starts = np.where(idx > 0, line_ends[np.maximum(idx - 1, 0)] + 1, 0)
+    return starts, line_ends[idx] - starts
+
+
+def intern_strings(values):
+    """Map strings to integer ids; returns (Int32 codes with <NA> for missing, string table)."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    codes = pd.array(codes, dtype="Int32")
+    codes[codes == -1] = pd.NA
+    return codes, pd.Series(uniques, name="error_msg")
+
+
+# ==============================
+# Writing / Reading
+def write_compact(df, output_csv, files, runs=None):
+    """Write rows with text columns replaced by references, plus the side tables.
+
+    `files` is the list of source paths filled by log_parsers.ingest_directory
+    (position = file_id); `runs` the run summaries it collected, if any.
+    """
+    file_table_path, msg_table_path = side_table_paths(output_csv)
+    codes, table = intern_strings(df["error_msg"])
+
+    out = df.drop(columns=["raw_line", "error_msg"])
+    out.insert(df.columns.get_loc("error_msg"), "error_msg_id", codes)
+    write_csv(out, output_csv)
+
+    table = table.rename_axis("error_msg_id").reset_index()
+    # Uncategorized messages keep a short version of the text, as in the notebook
+    table["error_category"] = load_taxonomy("error_category").classify_series(
+        table["error_msg"], default=lambda text: str(text)[:100]
+    )
+    write_error_msg_table(table.set_index("error_msg_id"), output_csv)
+    pd.DataFrame({"file_id": range(len(files)), "path": files}).to_csv(file_table_path, index=False)
+    print(f"{len(table)} unique error messages → {msg_table_path}")
+    if runs is not None:
+        write_csv(pd.DataFrame(runs, columns=RUN_COLUMNS), run_table_path(output_csv))
+        print(f"{len(runs)} run summaries → {run_table_path(output_csv)}")
+    return out
+
+
+def load_error_msg_table(csv_path, column="error_msg"):
+    """String table indexed by error_msg_id; `column` may also be "error_category" (None: both)."""
+    _, msg_table_path = side_table_paths(csv_path)
+    table = pd.read_csv(msg_table_path, index_col="error_msg_id", keep_default_na=False)
+    return table if column is None else table[column]
+
+
+def write_error_msg_table(table, csv_path):
+    """Write a string table (indexed by error_msg_id) as the side table of `csv_path`.
+
+    Stages that carry error_msg_id into a new CSV write the table they read
+    next to it, so the ids never resolve against a later re-ingest.
+    """
+    _, msg_table_path = side_table_paths(csv_path)
+    table.to_csv(msg_table_path)
+
+
+def load_run_table(csv_path, columns=None):
+    """Run summaries indexed by file_id, or None for outputs written without them."""
+    path = run_table_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    return load_csv(path, columns=["file_id", *(columns or RUN_COLUMNS[1:])]).set_index("file_id")
+
+
+def load_file_table(csv_path):
+    file_table_path, _ = side_table_paths(csv_path)
+    return pd.read_csv(file_table_path, index_col="file_id")["path"]
+
+
+# ==============================
+# Materialization
+def attach_error_msgs(df, table):
+    """Add a text column named after `table` (error_msg / error_category) from `error_msg_id`."""
+    ids = df["error_msg_id"]
+    df[table.name] = table.reindex(ids.astype("Int64")).to_numpy()
+    return df
+
+
+def _open_source(path):
+    """Return (read(offset, length), close) for one ingested log file."""
+    f = open(path, "rb")
+
+    def read(off, ln):
+        f.seek(off)
+        return f.read(ln)
+    return read, f.close
+
+
+def materialize_raw_lines(df, files):
+    """Return the stripped raw_line text for each row of `df`, opening each source once."""
+    result = pd.Series(None, index=df.index, dtype=object)
+    for file_id, group in df.groupby("file_id"):
+        read, close = _open_source(files[int(file_id)])
+        try:
+            result.loc[group.index] = [
+                read(int(off), int(ln)).decode("utf-8", errors="ignore").strip()
+                for off, ln in zip(group["raw_offset"], group["raw_length"])
+            ]
+        finally:
+            close()
+    return result
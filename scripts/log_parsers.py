@@ -0,0 +1,511 @@
+"""
+log_parsers.py
+--------------
+Unified ATTEST log parser framework.
+
+Each log file is sniffed from its first few KB, then dispatched to the
+parser registered for that format. Every parser emits rows in the same
+schema (OUTPUT_COLUMNS), so convert_to_csv, standardize_logs and
+preprocess_logs all share one engine.
+
+Registered formats (checked in registration order):
+- attest:       "HH:MM:SS.fff # Result: FAILED ..." logs with DUT header block
+- standardized: "timestamp - testcase - status" lines
+- generic:      fallback, keyword-based status detection on every line
+
+Alongside its rows, each parsed file yields a one-row run summary (start,
+end, execution_duration, final status) and every status row gets
+step_duration, the seconds since the previous status line.
+"""
+
+import os
+import re
+from datetime import datetime
+import pandas as pd
+from file_dedup import content_hash
+from line_store import line_refs
+from taxonomy import load_taxonomy
+
+SNIFF_BYTES = 8192
+
+# Unified output schema
+OUTPUT_COLUMNS = [
+    "filename", "dut", "dut_version", "os_version", "config", "test_case_id",
+    "line_number", "timestamp", "run_date", "status", "error_msg", "suite", "raw_line",
+    "file_id", "raw_offset", "raw_length", "step_duration",
+]
+
+# Suite List
+SUITES = [
+    "ptp-oc", "ptp-tc", "dtmf", "tcp-xp-tec", "ipv6-host", "v6bgp4",
+    "rtp", "sctp", "lacp-tec", "ipv4", "ptp-bc", "udp-tec", "sip", "udp", "tcp", "lacp"
+]
+
+STATUS_NORMALIZE = {
+    "PASSED": "PASS", "FAILED": "FAIL", "ABORTED": "ABORT",
+    "PASS": "PASS", "FAIL": "FAIL", "ABORT": "ABORT",
+}
+
+FILE_DATE_PATTERN = re.compile(r"(\d{8})")
+
+
+# ==============================
+# Parser Registry
+PARSERS = {}
+
+
+def register_parser(name, sniff, timestamp_format="ISO8601", time_bounds=None):
+    """Register a parser under `name`; `sniff(head)` decides if it handles a file.
+
+    Parsers emit raw timestamp strings; `timestamp_format` is used to convert
+    them to datetime64[ns] in one vectorized call per file.
+    `time_bounds(lines, filename)` returns the first and last raw timestamps
+    in the file (including non-status lines) for the run summary.
+    """
+    def decorator(func):
+        PARSERS[name] = (sniff, func, timestamp_format, time_bounds)
+        return func
+    return decorator
+
+
+def detect_format(head):
+    """Return the name of the first registered parser whose sniffer accepts `head`."""
+    for name, (sniff, _, _, _) in PARSERS.items():
+        if sniff(head):
+            return name
+    return None
+
+
+# ==============================
+# Shared Helpers
+def infer_suite(filename):
+    fname_lower = filename.lower()
+    for su in SUITES:
+        if su in fname_lower:
+            return su
+    return None
+
+
+def infer_file_date(filename):
+    m = FILE_DATE_PATTERN.search(filename)
+    if not m:
+        return None
+    try:
+        return datetime.strptime(m.group(1), "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def path_context(file_path, root):
+    """Derive run_date / dut / suite from the <run_date>/<dut>/<suite>/ folder layout."""
+    parts = os.path.relpath(file_path, root).split(os.sep)[:-1]
+    run_date = parts[0] if len(parts) > 0 else None
+    dut = parts[1] if len(parts) > 1 else None
+    suite = parts[2] if len(parts) > 2 else None
+
+    if run_date and run_date.lower() == "unknown_date": run_date = None
+    if dut and dut.lower() in ["generic_dut", "unknown_dut"]: dut = None
+    if suite and suite.lower() == "unknown_suite": suite = None
+    return {"run_date": run_date, "dut": dut, "suite": suite}
+
+
+def scan_time_bounds(lines, extract):
+    """First and last raw timestamps in `lines`, scanning inward from both ends.
+
+    Only the header and trailer lines are usually touched, not the whole file.
+    """
+    first = next((t for t in map(extract, lines) if t), None)
+    if first is None:
+        return None, None
+    return first, next((t for t in map(extract, reversed(lines)) if t), None)
+
+
+# ==============================
+# Format: attest
+ATTEST_SNIFF = re.compile(r"^\d{2}:\d{2}:\d{2}\.\d+\s|DUT\s*NAME\s*[:=]", re.MULTILINE | re.IGNORECASE)
+LINE_TIME_PATTERN = re.compile(r"(\d{2}:\d{2}:\d{2}\.\d+)")
+HEADER_PATTERN = re.compile(
+    r"(DUT\s*NAME|DUT\s*VERSION|OS\s*VERSION|CONFIGURATION|Test\s*Case)\s*[:=]\s*(.+)",
+    re.IGNORECASE,
+)
+HEADER_KEYS = {
+    "DUTNAME": "dut_name", "DUTVERSION": "dut_version", "OSVERSION": "os_version",
+    "CONFIGURATION": "config", "TESTCASE": "test_case",
+}
+TEST_CASE_VALUE = re.compile(r"[A-Za-z0-9_\-\.]+")
+# Status & error message patterns, most specific first
+ATTEST_STATUS_PATTERNS = [
+    re.compile(r"#\s*Result\s*[:\-]?\s*(PASSED|FAILED|ABORTED|PASS|FAIL|ABORT)\b\s*[:\-]?\s*(.*)", re.IGNORECASE),
+    re.compile(r"#\s*TEST\s*CASE\s*(PASSED|FAILED|ABORTED|PASS|FAIL|ABORT)\b\s*[:\-]?\s*(.*)", re.IGNORECASE),
+    re.compile(r"\b(?:TEST\s*CASE\s*)?(PASSED|FAILED|ABORTED|PASS|FAIL|ABORT)\b\s*[:\-]?\s*(.*)", re.IGNORECASE),
+]
+DUT_VERSION_FILENAME = re.compile(r"_(AS|TEC|IP|BC|OC|V\d+)[-_]?\d{8}", re.IGNORECASE)
+DUT_VERSION_CONTENT = re.compile(r"version\s*[:=]\s*([A-Za-z0-9\.\-_]+)", re.IGNORECASE)
+DUT_NAME_FILENAME = re.compile(r"(DUT[^\W_]+)", re.IGNORECASE)
+TEST_CASE_FILENAME = re.compile(r"(tc_[a-zA-Z0-9_\-\.]+)")
+
+
+def infer_dut_version(filename, lines):
+    m = DUT_VERSION_FILENAME.search(filename)
+    if m:
+        return m.group(1).upper()
+    for line in lines:
+        m = DUT_VERSION_CONTENT.search(line)
+        if m:
+            return m.group(1).strip()
+    return "Generic_v1.0"
+
+
+def _sniff_attest(head):
+    return ATTEST_SNIFF.search(head) is not None
+
+
+def _attest_line_time(line):
+    m = LINE_TIME_PATTERN.match(line.lstrip())
+    return m.group(1) if m else None
+
+
+def _attest_time_bounds(lines, filename):
+    # Lines only carry the time of day; the date comes from the filename
+    file_date = infer_file_date(filename)
+    if not file_date:
+        return None, None
+    # .match on the stripped line, as parse_attest does: a time quoted inside a message is not a line time
+    first, last = scan_time_bounds(lines, _attest_line_time)
+    if first is None:
+        return None, None
+    return f"{file_date.isoformat()} {first}", f"{file_date.isoformat()} {last}"
+
+
+@register_parser("attest", _sniff_attest, timestamp_format="%Y-%m-%d %H:%M:%S.%f",
+                 time_bounds=_attest_time_bounds)
+def parse_attest(lines, filename, context):
+    """Single pass: header block values plus one row per PASS/FAIL/ABORT status line."""
+    header = {}
+    header_done = False
+    file_date = infer_file_date(filename)
+    date_prefix = f"{file_date.isoformat()} " if file_date else None
+    rows = []
+
+    for idx, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+
+        if not header_done:
+            m = HEADER_PATTERN.search(line)
+            if m:
+                key = HEADER_KEYS.get(re.sub(r"\s+", "", m.group(1)).upper())
+                val = m.group(2).strip()
+                if key == "test_case":
+                    tc = TEST_CASE_VALUE.match(val)
+                    val = tc.group(0) if tc else None
+                if key and val:
+                    header[key] = val
+                header_done = len(header) == len(HEADER_KEYS)
+
+        # Fast path: skip lines without any status keyword before running regexes
+        upper = line.upper()
+        if "PASS" not in upper and "FAIL" not in upper and "ABORT" not in upper:
+            continue
+
+        for pat in ATTEST_STATUS_PATTERNS:
+            m = pat.search(line)
+            if m:
+                break
+        else:
+            continue
+
+        # Raw "YYYY-MM-DD HH:MM:SS.fff" string, converted in bulk by finalize_rows()
+        ts_match = LINE_TIME_PATTERN.match(line)
+        timestamp = date_prefix + ts_match.group(1) if ts_match and date_prefix else None
+
+        rows.append({
+            "line_number": idx,
+            "timestamp": timestamp,
+            "status": STATUS_NORMALIZE[m.group(1).upper()],
+            "error_msg": m.group(2).strip() or None,
+            "raw_line": line,
+        })
+
+    # Fallbacks for missing header values
+    dut_name = header.get("dut_name") or context.get("dut")
+    if not dut_name:
+        m = DUT_NAME_FILENAME.search(filename)
+        dut_name = m.group(1) if m else "DUT_Auto"
+    dut_version = header.get("dut_version")
+    if not dut_version or dut_version.lower().startswith("unknown"):
+        dut_version = infer_dut_version(filename, lines)
+    test_case = header.get("test_case")
+    if not test_case:
+        m = TEST_CASE_FILENAME.search(filename)
+        test_case = m.group(1) if m else "default_tc"
+
+    constants = {
+        "dut": dut_name,
+        "dut_version": dut_version,
+        "os_version": header.get("os_version") or "Linux",
+        "config": header.get("config") or "Standard_Config",
+        "test_case_id": test_case,
+        "suite": infer_suite(filename) or context.get("suite"),
+    }
+    for row in rows:
+        row.update(constants)
+    return rows
+
+
+# ==============================
+# Format: standardized
+STANDARDIZED_LINE = re.compile(r"(\S+)\s+-\s+(\S+)\s+-\s+(\S+)")
+STANDARDIZED_SNIFF_SHARE = 0.5    # share of non-empty head lines that must be "a - b - c"
+
+
+def _sniff_standardized(head):
+    lines = [line.strip() for line in head.splitlines() if line.strip()]
+    matched = sum(1 for line in lines if STANDARDIZED_LINE.match(line))
+    return bool(lines) and matched > STANDARDIZED_SNIFF_SHARE * len(lines)
+
+
+def _standardized_time_bounds(lines, filename):
+    return scan_time_bounds(lines, lambda line: extract_first(STANDARDIZED_LINE, line.strip()))
+
+
+@register_parser("standardized", _sniff_standardized, time_bounds=_standardized_time_bounds)
+def parse_standardized(lines, filename, context):
+    rows = []
+    for idx, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        m = STANDARDIZED_LINE.match(line)
+        timestamp, testcase, token = m.groups() if m else (None, None, None)
+        # Same PASS / FAIL / ABORT vocabulary as the other parsers; other tokens are not a status
+        status = STATUS_NORMALIZE.get(token.upper()) if token else None
+        rows.append({
+            "line_number": idx,
+            "timestamp": timestamp,
+            "test_case_id": testcase,
+            "status": status,
+            "error_msg": line if status in ("FAIL", "ABORT") else None,
+            "raw_line": line,
+        })
+
+    constants = {
+        "run_date": context.get("run_date"),
+        "dut": context.get("dut") or os.path.splitext(filename)[0],
+        "suite": context.get("suite") or infer_suite(filename),
+    }
+    for row in rows:
+        row.update(constants)
+    return rows
+
+
+# ==============================
+# Format: generic (fallback)
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+TESTCASE_PATTERN = re.compile(r"(tc[_\-]?\S+)", re.IGNORECASE)
+DUT_VERSION_PATTERN = re.compile(r"DUT[_\s]?(v?\d+(\.\d+)*)", re.IGNORECASE)
+CONFIG_PATTERN = re.compile(r"config[:=]\s*([a-zA-Z0-9_\-\.]+)", re.IGNORECASE)
+
+# Status keywords/phrases live in taxonomy_rules.json ("status"), compiled into one matcher
+STATUS_TAXONOMY = load_taxonomy("status")
+
+# Config fallback from filename keywords, first match wins
+CONFIG_KEYWORDS = [
+    ("dtmf", "DTMF"), ("ptp", "PTP"), ("ipv6", "IPv6"), ("ipv4", "IPv4"), ("sip", "SIP"),
+    ("lacp", "LACP"), ("tcp", "TCP"), ("udp", "UDP"), ("sct", "SCTP"),
+]
+
+
+def extract_first(pattern, text):
+    match = pattern.search(text)
+    if match:
+        return match.group(1) if match.lastindex else match.group(0)
+    return None
+
+
+def config_from_filename(filename):
+    fname_lower = filename.lower()
+    for keyword, config in CONFIG_KEYWORDS:
+        if keyword in fname_lower:
+            return config
+    return None
+
+
+def _generic_time_bounds(lines, filename):
+    return scan_time_bounds(lines, lambda line: extract_first(TIMESTAMP_PATTERN, line))
+
+
+@register_parser("generic", lambda head: True, timestamp_format="%Y-%m-%d %H:%M:%S",
+                 time_bounds=_generic_time_bounds)
+def parse_generic(lines, filename, context):
+    rows = []
+    run_date = context.get("run_date")
+    dut = context.get("dut") or os.path.splitext(filename)[0]
+    suite = context.get("suite") or os.path.splitext(filename)[0]
+    file_config = config_from_filename(filename)
+    stripped = [line.strip() for line in lines]
+    statuses = STATUS_TAXONOMY.classify_many(stripped)
+
+    for idx, (line, status) in enumerate(zip(stripped, statuses), start=1):
+        if not line:
+            continue
+
+        timestamp = extract_first(TIMESTAMP_PATTERN, line)
+        if timestamp:
+            run_date = timestamp[:10]
+
+        rows.append({
+            "run_date": run_date,
+            "dut": dut,
+            "suite": suite,
+            "line_number": idx,
+            "timestamp": timestamp,
+            "test_case_id": extract_first(TESTCASE_PATTERN, line),
+            "status": status,
+            "error_msg": line if status in ("FAIL", "ABORT") else None,
+            "dut_version": extract_first(DUT_VERSION_PATTERN, line),
+            "config": extract_first(CONFIG_PATTERN, line) or file_config,
+            "raw_line": line,
+        })
+    return rows
+
+
+# ==============================
+# Entry Points
+def read_log(file_path):
+    """Return the raw bytes of a log file (hashed for dedupe before decoding)."""
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def finalize_rows(rows, filename, timestamp_format, data=None, file_id=None):
+    """Build the per-file frame and convert its timestamps with one vectorized call.
+
+    `timestamp` becomes datetime64[ns]; `run_date` becomes the normalized
+    datetime64[ns] day, taken from the parser's run_date or the timestamp.
+    When the file bytes are given, each row also gets a (file_id, raw_offset,
+    raw_length) reference to its raw line (see line_store.py).
+    """
+    frame = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+    frame["filename"] = filename
+    frame["timestamp"] = pd.to_datetime(
+        frame["timestamp"], format=timestamp_format, errors="coerce"
+    ).astype("datetime64[ns]")
+    run_date = pd.to_datetime(frame["run_date"], format="%Y-%m-%d", errors="coerce")
+    frame["run_date"] = run_date.fillna(frame["timestamp"].dt.normalize()).astype("datetime64[ns]")
+    if data is not None and not frame.empty:
+        frame["file_id"] = file_id
+        frame["raw_offset"], frame["raw_length"] = line_refs(data, frame["line_number"])
+    return frame
+
+
+def run_timings(frame, bounds, timestamp_format, filename, file_id=None):
+    """Fill `step_duration` on one file's frame and return its run summary row.
+
+    The run spans the earliest / latest of the parser's time bounds and the
+    status-line timestamps. step_duration is the seconds since the previous
+    status line (the first one counts from the run start); rows without a
+    timestamp get NaN.
+    """
+    edges = pd.to_datetime(pd.Series(bounds, dtype=object), format=timestamp_format, errors="coerce")
+    times = pd.concat([edges.astype("datetime64[ns]"), frame["timestamp"]], ignore_index=True)
+    start, end = times.min(), times.max()
+
+    status_rows = frame["status"].notna()
+    step_times = frame.loc[status_rows, "timestamp"]
+    previous = step_times.shift(1)
+    if len(previous):
+        previous.iloc[0] = start
+    frame["step_duration"] = (step_times - previous).dt.total_seconds()
+
+    def first(col):
+        values = frame[col].dropna()
+        return values.iloc[0] if len(values) else None
+
+    statuses = frame.loc[status_rows, "status"]
+    return {
+        "file_id": file_id,
+        "filename": filename,
+        "test_case_id": first("test_case_id"),
+        "dut": first("dut"),
+        "suite": first("suite"),
+        "run_start": start,
+        "run_end": end,
+        "execution_duration": (end - start).total_seconds() if pd.notna(start) else None,
+        "final_status": statuses.iloc[-1] if len(statuses) else None,
+        "status_lines": len(statuses),
+    }
+
+
+def parse_bytes(data, filename, context=None, fmt=None, file_id=None):
+    """Sniff the format of one log and parse it into a unified-schema frame.
+
+    Returns (format_name, frame, run) where `run` is the file's run summary (schema.RUN_COLUMNS).
+    """
+    # Split on "\n" only so line numbers line up with byte offsets in `data`
+    text = data.decode("utf-8", errors="ignore")
+    fmt = fmt or detect_format(text[:SNIFF_BYTES])
+    _, parser, timestamp_format, time_bounds = PARSERS[fmt]
+    lines = text.split("\n")
+    rows = parser(lines, filename, context or {})
+    frame = finalize_rows(rows, filename, timestamp_format, data, file_id)
+    bounds = time_bounds(lines, filename) if time_bounds else (None, None)
+    return fmt, frame, run_timings(frame, bounds, timestamp_format, filename, file_id)
+
+
+def parse_file(file_path, context=None, fmt=None, file_id=None):
+    return parse_bytes(read_log(file_path), os.path.basename(file_path), context, fmt, file_id)
+
+
+def ingest_directory(input_dir, extensions=(".log", ".txt"), fmt=None, seen_hashes=None, files=None,
+                     on_frame=None, runs=None, hashes=None):
+    """Walk `input_dir`, parse every log file and return one unified-schema DataFrame.
+
+    Files whose content hash is already in `seen_hashes` are skipped without
+    decoding or parsing; new hashes are added to the set. A fresh set is used
+    when none is given, so duplicates within one tree are parsed once.
+    Parsed file paths are appended to `files`; a row's file_id is its position.
+    Their content hashes are appended to `hashes` (same positions) when given.
+    Each file's run summary (schema.RUN_COLUMNS) is appended to `runs` when given.
+    `on_frame(frame)` is called with each file's rows as soon as they are parsed.
+    """
+    seen_hashes = set() if seen_hashes is None else seen_hashes
+    files = [] if files is None else files
+    frames = []
+    format_counts = {}
+    skipped = 0
+    for root, dirnames, filenames in os.walk(input_dir):
+        # Deterministic order (<run_date>/ folders sort chronologically)
+        dirnames.sort()
+        for file in sorted(filenames):
+            if not file.endswith(extensions):
+                continue
+            file_path = os.path.join(root, file)
+            data = read_log(file_path)
+            digest = content_hash(data)
+            if digest in seen_hashes:
+                skipped += 1
+                continue
+            seen_hashes.add(digest)
+            file_fmt, frame, run = parse_bytes(
+                data, file, path_context(file_path, input_dir), fmt, file_id=len(files)
+            )
+            files.append(os.path.abspath(file_path))
+            if hashes is not None:
+                hashes.append(digest)
+            if runs is not None:
+                runs.append(run)
+            format_counts[file_fmt] = format_counts.get(file_fmt, 0) + 1
+            if not frame.empty:
+                frames.append(frame)
+                if on_frame:
+                    on_frame(frame)
+
+    if format_counts:
+        print("Formats detected:", format_counts)
+    if skipped:
+        print(f"Skipped {skipped} duplicate log files (content hash already seen)")
+    if not frames:
+        return finalize_rows([], None, None)
+    return pd.concat(frames, ignore_index=True)
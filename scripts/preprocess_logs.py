@@ -1,104 +1,16 @@
-import os
 import re
 import pandas as pd
-from datetime import datetime
+from log_parsers import SUITES, ingest_directory
+from line_store import write_compact
+from anomaly_detector import FailureRateDetector
+from history_store import HistoryStore
 
 #Paths
 INPUT_DIR = "C:/Users/hemalatha/Desktop/attest-eda/data/standardized"
 OUTPUT_CSV = "C:/Users/hemalatha/Desktop/attest-eda/data/logs_preprocessed.csv"
-
-#Suite List
-SUITES = [
-    "ptp-oc", "ptp-tc", "dtmf", "tcp-xp-tec", "ipv6-host", "v6bgp4",
-    "rtp", "sctp", "lacp-tec", "ipv4", "ptp-bc", "udp-tec", "sip", "udp", "tcp", "lacp"
-]
-
-#DUT Header Extraction
-def extract_header_info(file_path):
-    """Extract DUT, version, OS, configuration, and test case info from header lines."""
-    dut_name, dut_version, os_version, config, test_case = None, None, None, None, None
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            line = line.strip()
-            patterns = {
-                "dut_name": r"DUT\s*NAME\s*[:=]\s*(.+)",
-                "dut_version": r"DUT\s*VERSION\s*[:=]\s*(.+)",
-                "os_version": r"OS\s*VERSION\s*[:=]\s*(.+)",
-                "config": r"CONFIGURATION\s*[:=]\s*(.+)",
-                "test_case": r"Test\s*Case\s*[:=]\s*([A-Za-z0-9_\-\.]+)"
-            }
-            for key, pat in patterns.items():
-                m = re.search(pat, line, re.IGNORECASE)
-                if m:
-                    val = m.group(1).strip()
-                    if key == "dut_name": dut_name = val
-                    elif key == "dut_version": dut_version = val
-                    elif key == "os_version": os_version = val
-                    elif key == "config": config = val
-                    elif key == "test_case": test_case = val
-            if all([dut_name, dut_version, os_version, config, test_case]):
-                break
-    return dut_name, dut_version, os_version, config, test_case
-
-
-#Log Line Extraction
-def extract_log_line_features(line, file_date=None, filename=None):
-    """Extract timestamp, status (PASS/FAIL/ABORT), and reason message from log lines."""
-    line = line.strip()
-    timestamp, status, error_msg, run_date, suite = None, None, None, None, None
-
-    # Timestamp extraction
-    ts_match = re.match(r"(\d{2}:\d{2}:\d{2}\.\d+)", line)
-    if ts_match and file_date:
-        time_str = ts_match.group(1)
-        try:
-            timestamp = datetime.strptime(f"{file_date} {time_str}", "%Y-%m-%d %H:%M:%S.%f")
-            run_date = timestamp.date()
-        except Exception:
-            run_date = file_date
-
-    # Status & error message extraction
-    patterns = [
-        r"#\s*Result\s*[:\-]?\s*(PASSED|FAILED|ABORTED|PASS|FAIL|ABORT)\b\s*[:\-]?\s*(.*)",
-        r"#\s*TEST\s*CASE\s*(PASSED|FAILED|ABORTED|PASS|FAIL|ABORT)\b\s*[:\-]?\s*(.*)",
-        r"\b(TEST\s*CASE\s*)?(PASSED|FAILED|ABORTED|PASS|FAIL|ABORT)\b\s*[:\-]?\s*(.*)",
-    ]
-    for pat in patterns:
-        m = re.search(pat, line, re.IGNORECASE)
-        if m:
-            groups = [g for g in m.groups() if g]
-            for g in groups:
-                if g.upper() in ["PASSED", "FAILED", "ABORTED", "PASS", "FAIL", "ABORT"]:
-                    status = g.upper()
-                    if status == "PASSED": status = "PASS"
-                    elif status == "FAILED": status = "FAIL"
-                    elif status == "ABORTED": status = "ABORT"
-            if len(groups) > 1:
-                error_msg = groups[-1].strip()
-            break
-
-    # Suite inference
-    if filename:
-        for su in SUITES:
-            if su.lower() in filename.lower():
-                suite = su
-                break
-
-    os_version = "Linux"
-    return timestamp, status, error_msg, run_date, suite, os_version
-
-
-#DUT Version Fallback
-def infer_dut_version(file, lines):
-    m = re.search(r'_(AS|TEC|IP|BC|OC|V\d+)[-_]?\d{8}', file, re.IGNORECASE)
-    if m:
-        return m.group(1).upper()
-    for line in lines:
-        m = re.search(r"version\s*[:=]\s*([A-Za-z0-9\.\-_]+)", line, re.IGNORECASE)
-        if m:
-            return m.group(1).strip()
-    return "Generic_v1.0"
-
+ANOMALY_STATE = "C:/Users/hemalatha/Desktop/attest-eda/data/anomaly_state.json"
+ANOMALY_CSV = "C:/Users/hemalatha/Desktop/attest-eda/data/failure_rate_anomalies.csv"
+HISTORY_STORE = "C:/Users/hemalatha/Desktop/attest-eda/data/test_history.json"
 
 #Smart Missing Value Handling
 def fix_missing_values(df):
@@ -107,15 +19,12 @@ def fix_missing_values(df):
     #Timestamp and run_date repair 
     df["timestamp"] = df.groupby("filename")["timestamp"].ffill().bfill()
 
-    def infer_date(fname):
-        m = re.search(r"(\d{8})", fname)
-        return datetime.strptime(m.group(1), "%Y%m%d").date() if m else None
-
-    df["run_date"] = df.groupby("filename")["run_date"].ffill().bfill()
-    df["run_date"] = df.apply(
-        lambda x: x["run_date"] if pd.notna(x["run_date"]) else infer_date(x["filename"]),
-        axis=1
+    # Filename dates converted in one vectorized call instead of per-row strptime
+    file_dates = pd.to_datetime(
+        df["filename"].str.extract(r"(\d{8})", expand=False), format="%Y%m%d", errors="coerce"
     )
+    df["run_date"] = df.groupby("filename")["run_date"].ffill().bfill()
+    df["run_date"] = df["run_date"].fillna(file_dates)
 
     # Suite inference 
     def infer_suite(row):
@@ -161,60 +70,10 @@ def fix_missing_values(df):
 
 
 #Main Processing
-def process_logs(input_dir):
-    all_data = []
-    for root, _, files in os.walk(input_dir):
-        for file in files:
-            if not file.endswith(".log"):
-                continue
-
-            filepath = os.path.join(root, file)
-            date_match = re.search(r'(\d{8})', file)
-            file_date = datetime.strptime(date_match.group(1), "%Y%m%d").date() if date_match else None
-
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-
-            # Header extraction
-            dut_name, dut_version, os_version, config, test_case = extract_header_info(filepath)
-
-            # Fallbacks
-            if not dut_name:
-                m = re.search(r'(DUT[^\W_]+)', file, re.IGNORECASE)
-                dut_name = m.group(1) if m else "DUT_Auto"
-            if not dut_version or dut_version.lower().startswith("unknown"):
-                dut_version = infer_dut_version(file, lines)
-            if not os_version:
-                os_version = "Linux"
-            if not config:
-                config = "Standard_Config"
-            if not test_case:
-                m = re.search(r'(tc_[a-zA-Z0-9_\-\.]+)', file)
-                test_case = m.group(1) if m else "default_tc"
-
-            # Parse each log line
-            for idx, line in enumerate(lines, start=1):
-                timestamp, status, error_msg, run_date, suite, os_version = extract_log_line_features(
-                    line, file_date, file
-                )
-                all_data.append({
-                    "filename": file,
-                    "dut": dut_name,
-                    "dut_version": dut_version,
-                    "os_version": os_version,
-                    "config": config,
-                    "test_case_id": test_case,
-                    "line_number": idx,
-                    "timestamp": timestamp,
-                    "run_date": run_date,
-                    "status": status,
-                    "error_msg": error_msg,
-                    "suite": suite,
-                    "raw_line": line.strip(),
-                })
-
-    # Build DataFrame
-    df = pd.DataFrame(all_data)
+def process_logs(input_dir, files=None, on_frame=None, runs=None, hashes=None):
+    # Parse every log with the unified parser; attest logs only emit status lines
+    df = ingest_directory(input_dir, extensions=(".log",), files=files, on_frame=on_frame, runs=runs,
+                          hashes=hashes)
     df = df[(df["status"].notna()) | (df["error_msg"].notna())]
 
     # Fix missing values
@@ -222,9 +81,26 @@ def process_logs(input_dir):
     return df
 
 
-#Run Script 
-if __name__ == "__main__":
-    df = process_logs(INPUT_DIR)
+#Full Ingestion Run
+def run_preprocessing(input_dir=INPUT_DIR, output_csv=OUTPUT_CSV):
+    files, runs, hashes = [], [], []
+    # Failure-rate anomalies are flagged as windows close; fed after ingestion, in time order,
+    # with only the files not already counted in an earlier run (by content hash)
+    detector = FailureRateDetector(
+        on_anomaly=lambda a: print(f"Anomaly: {a['key_column']}={a['key']} on {a['window_start']:%Y-%m-%d} "
+                                   f"failure rate {a['failure_rate']:.2f} > {a['threshold']:.2f}")
+    ).load_state(ANOMALY_STATE)
+    # Per-test-case run history for flakiness queries, updated per parsed file
+    history = HistoryStore(HISTORY_STORE)
+
+    df = process_logs(input_dir, files, on_frame=history.update_frame, runs=runs, hashes=hashes)
+    detector.update_frame(df, file_hashes=hashes)
+    detector.close_expired()
+    if detector.late_rows:
+        print(f"WARNING: {detector.late_rows} rows fell in already-closed anomaly windows and were not scored")
+    detector.save_state(ANOMALY_STATE)
+    detector.anomalies_frame().to_csv(ANOMALY_CSV, index=False)
+    history.save()
     print("Total rows extracted:", len(df))
 
     print("\nStatus Summary:")
@@ -236,11 +112,21 @@ if __name__ == "__main__":
     print("\nRemaining Missing Values:")
     print(df.isna().sum())
 
-    df.to_csv(OUTPUT_CSV, index=False)
-    print(f"\nClean preprocessed log data saved → {OUTPUT_CSV}")
+    # raw_line / error_msg text goes to side tables (see line_store.py)
+    write_compact(df, output_csv, files, runs)
+    print(f"\nClean preprocessed log data saved → {output_csv}")
 
     # Quick Failure Summary
     fail_summary = df[df["status"].isin(["FAIL", "ABORT"])].groupby("error_msg").size().reset_index(name="count")
     fail_summary = fail_summary.sort_values(by="count", ascending=False)
     print("\nTop Failure Reasons:")
     print(fail_summary.head(10))
+
+    print("\nTop Flaky Tests:")
+    print(pd.DataFrame(history.top_flaky(10)))
+    return df
+
+
+#Run Script 
+if __name__ == "__main__":
+    run_preprocessing()
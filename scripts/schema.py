@@ -0,0 +1,104 @@
+"""
+schema.py
+---------
+Shared column schema for every pipeline CSV, with a projected loader and a
+matching writer.
+
+Each stage loads through load_csv(path, columns=[...]) naming only the
+columns it uses, so pandas never infers dtypes, never reads unused text
+columns, and stores low-cardinality fields (dut, suite, config, status, ...)
+as categoricals.
+"""
+
+import pandas as pd
+
+# Column → dtype; datetime columns are parsed separately with an explicit format
+COLUMN_DTYPES = {
+    # Parsed log rows (log_parsers.OUTPUT_COLUMNS)
+    "filename": "string",
+    "dut": "category",
+    "dut_version": "category",
+    "os_version": "category",
+    "config": "category",
+    "test_case_id": "category",
+    "line_number": "Int32",
+    "timestamp": "datetime64[ns]",
+    "run_date": "datetime64[ns]",
+    "status": "category",
+    "error_msg": "string",
+    "error_msg_id": "Int32",
+    "error_category": "category",
+    "suite": "category",
+    "raw_line": "string",
+    "file_id": "Int32",
+    "raw_offset": "Int64",
+    "raw_length": "Int32",
+    "step_duration": "float64",
+    # Run summaries (<output>.runs.csv, RUN_COLUMNS)
+    "run_start": "datetime64[ns]",
+    "run_end": "datetime64[ns]",
+    "execution_duration": "float64",
+    "final_status": "category",
+    "status_lines": "Int32",
+    # feature_engineering.py
+    "failure_freq_suite": "float64",
+    "failure_freq_dut": "float64",
+    "total_runs_suite": "float64",
+    "failure_ratio_suite": "float64",
+    "time_since_last_failure": "float64",
+    "avg_exec_duration_suite": "float64",
+    "config_hash": "Int64",
+    "recent_failure_flag": "Int8",
+    # failure_clustering.py
+    "is_failure": "Int8",
+    "cluster": "Int16",
+}
+
+DATETIME_COLUMNS = [c for c, t in COLUMN_DTYPES.items() if t.startswith("datetime64")]
+
+# One row per parsed log file, written by line_store.write_compact()
+RUN_COLUMNS = [
+    "file_id", "filename", "test_case_id", "dut", "suite",
+    "run_start", "run_end", "execution_duration", "final_status", "status_lines",
+]
+
+
+def load_csv(path, columns=None, **kwargs):
+    """Read a pipeline CSV with declared dtypes, reading only `columns` when given.
+
+    Requested columns missing from the file are skipped (older outputs), so
+    callers should check `df.columns` for optional ones.
+    """
+    wanted = set(columns) if columns else None
+    usecols = (lambda c: c in wanted) if wanted else None
+    header = pd.read_csv(path, nrows=0, usecols=usecols).columns
+    dtypes = {c: COLUMN_DTYPES[c] for c in header
+              if c in COLUMN_DTYPES and c not in DATETIME_COLUMNS}
+
+    df = pd.read_csv(path, usecols=usecols, dtype=dtypes, **kwargs)
+    for col in DATETIME_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format="ISO8601", errors="coerce").astype("datetime64[ns]")
+    if columns:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+def write_csv(df, path):
+    """Write a pipeline CSV; timestamps/run_date are written as ISO 8601 for load_csv."""
+    df.to_csv(path, index=False)
+
+
+def fill_category(series, value):
+    """fillna() for categorical (or to-be-categorical) columns without materializing strings.
+
+    `value` becomes a category only when something is missing, so value_counts()
+    and plots don't show an empty fill category.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype("category")
+    if not series.isna().any():
+        return series
+    if value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
@@ -0,0 +1,97 @@
+"""
+window_features.py
+------------------
+Trailing-window failure counts and rates per DUT / suite / test case.
+
+For every row at time t and each key column, counts the key's runs and
+failures in (t - window, t) for every window in WINDOWS:
+- point-in-time correct: only rows strictly earlier than t are counted, so
+  a row never sees its own outcome (or one logged at the same instant)
+- one time sort shared by all key columns, a cheap stable re-sort by key
+  code per column, then every window is resolved with a vectorized merge
+  (np.searchsorted) against a prefix sum of failures; no groupby-rolling
+  and no per-group Python loops
+- rows with a NaT timestamp or a missing key get NaN features and are not
+  counted in anyone else's window
+
+Output columns: fail_count_<key>_<window>, fail_rate_<key>_<window>.
+"""
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["dut", "suite", "test_case_id"]
+WINDOWS = {"1h": "1h", "24h": "24h", "7d": "7D"}
+FAILED = "FAIL"
+INT64_LIMIT = 1 << 62
+NAT = np.iinfo(np.int64).min
+
+
+def _composite_times(codes, times, max_window):
+    """Fold (group code, time) into one int64 searchable across groups without overlap.
+
+    Times are shifted to start at 0 and each group gets its own band of
+    `stride` units, wider than the time range plus the largest window.
+    Returns (composite, unit); the unit (ns) is coarsened only when there
+    are too many groups for a nanosecond band to fit in int64.
+    """
+    t0 = times.min()
+    span = int(times.max() - t0) + max_window + 1
+    n_groups = int(codes.max()) + 1
+    unit = 1
+    while n_groups * (span // unit + 1) >= INT64_LIMIT:
+        unit *= 1000
+    stride = span // unit + 1
+    return codes.astype(np.int64) * stride + (times - t0) // unit, unit
+
+
+def key_window_features(keys, times, is_fail, windows=WINDOWS, time_order=None):
+    """Trailing fail counts / rates of one key column for every window.
+
+    `keys` is a Series, `times` int64 ns (NAT for NaT), `is_fail` a bool
+    array; `time_order` is a stable argsort of `times`, shared across key
+    columns when given. Returns {window_name: (fail_count, fail_rate)} float
+    arrays aligned with the input rows.
+    """
+    window_ns = {name: pd.Timedelta(w).value for name, w in windows.items()}
+    # Column 2i / 2i+1 = count / rate of window i; filled in sorted order, scattered back once
+    out = np.full((len(keys), 2 * len(window_ns)), np.nan)
+
+    codes, _ = pd.factorize(keys, use_na_sentinel=True)
+    if time_order is None:
+        time_order = np.argsort(times, kind="stable")
+    valid = time_order[(codes[time_order] >= 0) & (times[time_order] != NAT)]
+    if valid.size:
+        # Time-ordered rows re-sorted stably by key (radix sort for int16 codes) → (key, time) order
+        code_dtype = np.int16 if codes.max() < np.iinfo(np.int16).max else np.int32
+        order = valid[np.argsort(codes[valid].astype(code_dtype), kind="stable")]
+        composite, unit = _composite_times(codes[order], times[order], max(window_ns.values()))
+        fails = np.concatenate(([0], np.cumsum(is_fail[order], dtype=np.int64)))
+
+        # Rows strictly before each row's own timestamp (same-instant rows excluded)
+        right = np.searchsorted(composite, composite, side="left")
+        sorted_out = np.empty((len(order), out.shape[1]))
+        for i, w in enumerate(window_ns.values()):
+            left = np.searchsorted(composite, composite - w // unit, side="right")
+            runs = right - left
+            count = fails[right] - fails[left]
+            sorted_out[:, 2 * i] = count
+            sorted_out[:, 2 * i + 1] = np.divide(count, runs, out=np.full(len(runs), np.nan), where=runs > 0)
+        out[order] = sorted_out
+
+    return {name: (out[:, 2 * i].copy(), out[:, 2 * i + 1].copy()) for i, name in enumerate(window_ns)}
+
+
+def add_window_features(df, key_columns=KEY_COLUMNS, windows=WINDOWS, time_column="timestamp"):
+    """Add fail_count_<key>_<window> / fail_rate_<key>_<window> columns to `df`."""
+    times = df[time_column].to_numpy("datetime64[ns]").view(np.int64)
+    is_fail = (df["status"] == FAILED).to_numpy(dtype=bool, na_value=False)
+    time_order = np.argsort(times, kind="stable")
+    for key in key_columns:
+        if key not in df.columns:
+            continue
+        features = key_window_features(df[key], times, is_fail, windows, time_order)
+        for name, (count, rate) in features.items():
+            df[f"fail_count_{key}_{name}"] = count
+            df[f"fail_rate_{key}_{name}"] = rate
+    return df